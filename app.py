@@ -1,20 +1,48 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from prophet import Prophet
 import warnings
 warnings.filterwarnings('ignore')
 from datetime import datetime, timedelta
 import os
+import importlib
+import threading
+import uuid
 from dotenv import load_dotenv
-from snowflake_utils import SnowflakeConnection  # Import our custom SnowflakeConnection class
+from snowflake_utils import open_connection, DASHBOARD_AGGREGATES  # Import our custom SnowflakeConnection factory
+from data_mirror import get_table_mirror
+from frame_builder import build_frame
+from filter_index import FilterIndex
+from dimension_catalog import DimensionCatalog, get_dimension_catalog
+from cube import Cube
+from kpis import compute_kpis
+from shared_dataset import Dataset, DatasetHolder
+from forecasting import get_model_cache, predict, daily_series, stored_forecast, data_fingerprint, MIN_HISTORY_POINTS, FORECAST_ENGINES
+from fast_forecast import fit_fourier
+from forecast_jobs import get_forecast_jobs
+from tracing import get_tracer, span, traced
+# Plotly, Prophet and the Snowflake connector are imported where they are first used (and
+# pre-warmed after the first run, see prewarm_imports), keeping them off the path to the first cards
 
 # Load environment variables
 load_dotenv()
 
+# Compute chart aggregates in the warehouse instead of from the loaded frame
+PUSHDOWN_AGGREGATES = os.getenv('TOURISM_PUSHDOWN', '0') == '1'
+
+# Fold the events table into the rollup cube batch by batch instead of loading it into memory
+STREAMING_AGGREGATION = os.getenv('TOURISM_STREAMING', '0') == '1'
+
+# Forecast model the Forecasting tab starts with: "fast" (NumPy) or "prophet"
+FORECAST_ENGINE = os.getenv('TOURISM_FORECAST_ENGINE', 'fast')
+ENGINE_LABELS = {'fast': 'Fast (trend + seasonality)', 'prophet': 'Prophet'}
+
+# Imported on a background thread once the first page has been sent
+PREWARM_MODULES = ['plotly.express', 'plotly.graph_objects', 'plotly.io', 'prophet']
+
+# How often the forecast tab checks on a background fit
+FORECAST_POLL_SECONDS = 1.0
+
 # Page configuration
 st.set_page_config(
     page_title="Cultural Tourism Dashboard - India",
@@ -96,42 +124,38 @@ st.html("""
 </style>
 """)
 
-@st.cache_data
 def load_data():
-    """Load data from Snowflake database"""
+    """Load data from Snowflake database; runs once per dataset version, see get_dataset_holder()"""
     try:
-        # Initialize Snowflake connection
-        sf = SnowflakeConnection()
-        if not sf.connect():
-            st.error("Failed to connect to Snowflake database")
-            return None
-        
-        # Load data with filters
-        df = sf.load_cultural_data()
+        mirror = get_table_mirror()
+        if mirror is not None:
+            # Serve from the local Parquet mirror, fetching only rows newer than its watermark
+            table = mirror.load(open_connection())
+            df = table.to_pandas() if table is not None else None
+        else:
+            # Check out a pooled Snowflake connection shared with other sessions
+            sf = open_connection()
+            if not sf.connect():
+                st.error("Failed to connect to Snowflake database")
+                return None
+            
+            # Load data with filters
+            try:
+                df = sf.load_cultural_data()
+            finally:
+                # Return the connection to the pool
+                sf.disconnect()
         
         if df is None or df.empty:
             st.error("No data retrieved from Snowflake")
             return None
             
-        # Ensure date column is datetime and rename if needed
-        if 'DATE' in df.columns:
-            df['Date'] = pd.to_datetime(df['DATE'])
-            df = df.drop('DATE', axis=1)
-        elif 'Date' in df.columns:
-            df['Date'] = pd.to_datetime(df['Date'])
-        
-        # Add derived columns if not present in Snowflake
-        if 'MONTH' not in df.columns:
-            df['MONTH'] = df['Date'].dt.month
-        if 'YEAR' not in df.columns:
-            df['YEAR'] = df['Date'].dt.year
-        if 'QUARTER' not in df.columns:
-            df['QUARTER'] = df['Date'].dt.quarter.apply(lambda x: f'Q{x}')
-        if 'REGION' not in df.columns:
-            df['REGION'] = df['STATE'].apply(get_region)
+        # New data may bring new states, events or years
+        get_dimension_catalog.clear()
         
-        # Close Snowflake connection
-        sf.disconnect()
+        # Categoricals, downcast numerics and vectorized derived columns
+        with span('build_frame', rows=len(df)):
+            df = build_frame(df, report=os.getenv('TOURISM_MEMORY_REPORT') == '1')
         
         return df
         
@@ -139,116 +163,540 @@ def load_data():
         st.error(f"Error loading data from Snowflake: {str(e)}")
         return None
 
-def get_region(state):
-    """Map states to regions"""
-    regions = {
-        'North': ['Punjab', 'Himachal Pradesh', 'Uttar Pradesh'],
-        'South': ['Kerala', 'Karnataka', 'Tamil Nadu'],
-        'West': ['Rajasthan', 'Gujarat', 'Maharashtra', 'Goa'],
-        'East': ['West Bengal', 'Odisha', 'Assam'],
-        'Northeast': ['Meghalaya', 'Manipur']
-    }
+def stream_data():
+    """Aggregate the events table into the rollup cube one result batch at a time; the rows are never all in memory"""
+    try:
+        sf = open_connection()
+        # Each batch is built like load_data()'s frame, folded into the cube and released
+        frames = (build_frame(frame) for frame in sf.iter_cultural_data())
+        with span('stream_cube') as stream_span:
+            cube = Cube.from_frames(frames)
+            if stream_span and cube is not None:
+                stream_span.set(cells=len(cube.cells))
+        if cube is None:
+            st.error("No data retrieved from Snowflake")
+            return None
+        get_dimension_catalog.clear()
+        return Dataset(None, derived={'cube': cube})
+    except Exception as e:
+        st.error(f"Error loading data from Snowflake: {str(e)}")
+        return None
+
+@st.cache_resource
+def get_dataset_holder():
+    """Process-wide holder of the events data; every session reads the same frame instead of its own copy"""
+    return DatasetHolder(stream_data if STREAMING_AGGREGATION else load_data)
+
+@st.cache_data(ttl=600)
+def load_aggregate(name, filters):
+    """Run a dashboard aggregate in Snowflake, returning only the grouped rows"""
+    sf = open_connection()
+    return sf.run_aggregate(name, filters)
+
+def get_aggregate(name, cube, cells, filters):
+    """Data for one chart, pushed down to Snowflake or re-summed from the selected cube cells"""
+    with span('aggregate', aggregate=name, source='pushdown' if PUSHDOWN_AGGREGATES else 'cube'):
+        if PUSHDOWN_AGGREGATES:
+            return load_aggregate(name, filters)
+        return cube.evaluate(DASHBOARD_AGGREGATES[name], cells)
+
+def show_chart(fig):
+    """Draw a Plotly figure, downsampled first; traced, since serializing the figure is a large part of a rerun"""
+    from chart_prep import prepare_figure, figure_bytes
     
-    for region, states in regions.items():
-        if state in states:
-            return region
-    return 'Other'
+    with span('chart') as chart_span:
+        points, kept = prepare_figure(fig)
+        if chart_span:
+            chart_span.set(title=fig.layout.title.text, traces=len(fig.data), points=points, points_sent=kept,
+                           bytes=figure_bytes(fig))
+        st.plotly_chart(fig, use_container_width=True)
 
 @st.cache_data
-def prepare_forecast_data(df, state=None, event=None):
-    """Prepare data for Prophet forecasting"""
+def prepare_forecast_data(_dataset, version, state=None, event=None):
+    """Prepare data for Prophet forecasting; cached per dataset version rather than by hashing the frame"""
+    if _dataset.df is None:
+        # Streamed datasets keep only the cube, whose cells still resolve to single days
+        cube = _dataset.derived('cube', Cube)
+        return cube.daily(cube.slice(STATE=state, EVENT=event))
+    
     # Filter data if specified
-    forecast_df = df.copy()
-    if state and state != 'All':
-        forecast_df = forecast_df[forecast_df['STATE'] == state]
-    if event and event != 'All':
-        forecast_df = forecast_df[forecast_df['EVENT'] == event]
+    forecast_df = _dataset.derived('filter_index', FilterIndex).filter(STATE=state, EVENT=event)
     
     # Aggregate by date
-    daily_visitors = forecast_df.groupby('Date')['VISITORS'].sum().reset_index()
-    daily_visitors.columns = ['ds', 'y']
-    
-    return daily_visitors
+    return daily_series(forecast_df)
 
-def create_forecast(df, periods=365):
-    """Create Prophet forecast"""
-    try:
-        model = Prophet(
-            yearly_seasonality=True,
-            weekly_seasonality=True,
-            daily_seasonality=False,
-            changepoint_prior_scale=0.05
-        )
-        
-        # Add custom seasonalities
-        model.add_seasonality(name='monthly', period=30.5, fourier_order=5)
-        
-        model.fit(df)
+def create_forecast(df, periods=365, state='All', event='All', engine='prophet'):
+    """Create a forecast with the chosen engine; Prophet reuses a cached model fitted to the same series.
+
+    Prophet fits run on a background thread, so errors are raised to the caller instead of drawn.
+    """
+    with span('forecast', engine=engine, state=state, event=event, periods=periods):
+        if engine == 'fast':
+            model = fit_fourier(df)
+        else:
+            model = get_model_cache().get_or_fit(df, state, event)
         
         # Create future dataframe
-        future = model.make_future_dataframe(periods=periods)
-        forecast = model.predict(future)
-        
-        return model, forecast
-    except Exception as e:
-        st.error(f"Error creating forecast: {str(e)}")
-        return None, None
+        forecast = predict(model, periods)
+    
+    return model, forecast
 
-def main():
-    # Header
-    st.html('<h1 class="main-header">🏛️ Cultural Tourism Dashboard - India</h1>')
+def submit_forecast(history, periods, state, event):
+    """Start (or join) the background job for this forecast and make it this session's current job"""
+    jobs = get_forecast_jobs()
+    session_id = st.session_state.setdefault('session_id', uuid.uuid4().hex)
+    key = (state, event, data_fingerprint(history), periods)
     
-    # Load data
-    with st.spinner('Loading cultural tourism data from Snowflake...'):
-        df = load_data()
+    # Let go of the job for the previous selection so it can be cancelled if nobody else wants it
+    previous = st.session_state.get('forecast_job')
+    if previous is not None and previous != key:
+        jobs.release(previous, session_id)
+    st.session_state['forecast_job'] = key
+    
+    return jobs.submit(key, session_id, create_forecast, history, periods, state, event)
+
+def release_forecast():
+    """Let go of this session's background forecast job, if any, so it can be cancelled if nobody else wants it"""
+    previous = st.session_state.pop('forecast_job', None)
+    if previous is not None:
+        get_forecast_jobs().release(previous, st.session_state['session_id'])
+
+@st.fragment(run_every=FORECAST_POLL_SECONDS)
+def wait_for_forecast(job):
+    """Placeholder polled while a forecast job runs; reruns the page once it is done"""
+    if job.done():
+        st.rerun()
+    st.info("⏳ Fitting the forecast model in the background. Other tabs are ready to use meanwhile.")
+
+@st.fragment
+@traced('tab.overview')
+def render_overview(cube, cells, filters):
+    """Overview tab: monthly trend, top events and state table"""
+    import plotly.express as px
+    
+    st.subheader("Tourism Trends Overview")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Monthly visitors trend
+        monthly_data = get_aggregate('monthly_trend', cube, cells, filters)
+        monthly_data['Date'] = pd.to_datetime(monthly_data[['YEAR', 'MONTH']].assign(day=1))
+        
+        fig = px.line(monthly_data, x='Date', y='VISITORS', 
+                     title='Monthly Visitor Trends',
+                     color_discrete_sequence=['#FF6B35'])
+        fig.update_layout(height=400)
+        show_chart(fig)
+    
+    with col2:
+        # Top events by visitors
+        event_stats = get_aggregate('top_events', cube, cells, filters)
+        
+        fig = px.bar(x=event_stats['VISITORS'], y=event_stats['EVENT'], 
+                    orientation='h',
+                    title='Top Events by Visitors',
+                    color_discrete_sequence=['#F7931E'])
+        fig.update_layout(height=400)
+        show_chart(fig)
+    
+    # State-wise analysis
+    st.subheader("State-wise Cultural Tourism")
+    state_stats = get_aggregate('state_stats', cube, cells, filters).set_index('STATE').round(2)
+    state_stats.columns = ['Total Visitors', 'Revenue (₹)', 'Employment', 'Total Events']
+    st.dataframe(state_stats, use_container_width=True)
+
+@st.fragment
+@traced('tab.calendar')
+def render_calendar(cube, cells, filters):
+    """Cultural Calendar tab: seasonal and weekday patterns and the calendar heatmap"""
+    import plotly.express as px
+    
+    st.subheader("Cultural Calendar & Seasonality")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Seasonal patterns
+        seasonal_data = get_aggregate('seasonal_means', cube, cells, filters)
+        months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+        seasonal_data['Month_Name'] = [months[i-1] for i in seasonal_data['MONTH']]
+        
+        fig = px.bar(seasonal_data, x='Month_Name', y='VISITORS',
+                    title='Average Visitors by Month',
+                    color='VISITORS',
+                    color_continuous_scale='Oranges')
+        show_chart(fig)
+    
+    with col2:
+        # Weekly patterns
+        weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+        weekly_data = get_aggregate('weekday_means', cube, cells, filters).set_index('WEEKDAY')['VISITORS']
+        weekly_data = weekly_data.reindex(range(1, 8)).set_axis(weekday_order)
+        
+        fig = px.bar(x=weekly_data.index, y=weekly_data.values,
+                    title='Average Visitors by Day of Week',
+                    color_discrete_sequence=['#764ba2'])
+        show_chart(fig)
+    
+    # Cultural event calendar heatmap
+    st.subheader("Event Calendar Heatmap")
+    
+    # Create a more detailed calendar view
+    heatmap_data = get_aggregate('calendar_heatmap', cube, cells, filters)
+    heatmap_pivot = heatmap_data.pivot(index='MONTH', columns='DAY', values='VISITORS').fillna(0)
+    
+    fig = px.imshow(heatmap_pivot, 
+                   title="Cultural Tourism Intensity Calendar",
+                   color_continuous_scale='Oranges',
+                   aspect='auto')
+    fig.update_layout(height=500)
+    show_chart(fig)
+
+@st.fragment
+@traced('tab.forecasting')
+def render_forecasting(dataset, catalog):
+    """Forecasting tab; its own controls rerun only this fragment"""
+    import plotly.graph_objects as go
+    
+    st.subheader("Tourism Forecasting")
+    
+    col1, col2 = st.columns([1, 3])
+    
+    with col1:
+        forecast_state = st.selectbox("Forecast State", ['All'] + catalog.values('STATE'), key='forecast_state')
+        forecast_event = st.selectbox("Forecast Event", ['All'] + catalog.values('EVENT', STATE=forecast_state),
+                                      key='forecast_event')
+        forecast_days = st.slider("Forecast Days", 30, 365, 180)
+        forecast_engine = st.selectbox("Forecast Model", FORECAST_ENGINES, index=FORECAST_ENGINES.index(FORECAST_ENGINE),
+                                       format_func=ENGINE_LABELS.get, key='forecast_engine')
+    
+    with col2:
+        forecast_data = prepare_forecast_data(dataset, dataset.version, forecast_state, forecast_event)
+        
+        job = None
+        if len(forecast_data) > MIN_HISTORY_POINTS:  # Minimum data points for forecasting
+            # Prefer the nightly batch forecast when it was fitted on this exact history
+            forecast = stored_forecast(forecast_data, forecast_state, forecast_event, forecast_days, forecast_engine)
+            if forecast is None and forecast_engine == 'fast':
+                # Fits in milliseconds, so it runs inline
+                try:
+                    model, forecast = create_forecast(forecast_data, forecast_days, forecast_state, forecast_event, 'fast')
+                except Exception as e:
+                    st.error(f"Error creating forecast: {str(e)}")
+            elif forecast is None:
+                # Fit in the background; other tabs render while this one shows a placeholder
+                job = submit_forecast(forecast_data, forecast_days, forecast_state, forecast_event)
+                if not job.done():
+                    wait_for_forecast(job)
+                elif job.exception() is not None:
+                    st.error(f"Error creating forecast: {str(job.exception())}")
+                else:
+                    model, forecast = job.result()
+        
+            if forecast is not None:
+                # Plot forecast
+                fig = go.Figure()
+        
+                # Historical data
+                fig.add_trace(go.Scatter(
+                    x=forecast_data['ds'],
+                    y=forecast_data['y'],
+                    mode='markers',
+                    name='Historical',
+                    marker=dict(color='#FF6B35', size=4)
+                ))
+        
+                # Forecast
+                future_data = forecast[forecast['ds'] > forecast_data['ds'].max()]
+                fig.add_trace(go.Scatter(
+                    x=future_data['ds'],
+                    y=future_data['yhat'],
+                    mode='lines',
+                    name='Forecast',
+                    line=dict(color='#F7931E', width=2)
+                ))
+        
+                # Confidence intervals
+                fig.add_trace(go.Scatter(
+                    x=future_data['ds'],
+                    y=future_data['yhat_upper'],
+                    fill=None,
+                    mode='lines',
+                    line_color='rgba(0,0,0,0)',
+                    showlegend=False
+                ))
+        
+                fig.add_trace(go.Scatter(
+                    x=future_data['ds'],
+                    y=future_data['yhat_lower'],
+                    fill='tonexty',
+                    mode='lines',
+                    line_color='rgba(0,0,0,0)',
+                    name='Confidence Interval',
+                    fillcolor='rgba(247, 147, 30, 0.2)'
+                ))
+        
+                fig.update_layout(
+                    title=f'Tourism Forecast - {forecast_state} - {forecast_event}',
+                    xaxis_title='Date',
+                    yaxis_title='Visitors',
+                    height=500
+                )
+        
+                show_chart(fig)
+        
+                # Forecast summary
+                future_sum = future_data['yhat'].sum()
+                avg_daily = future_sum / len(future_data)
+        
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Predicted Total Visitors", f"{future_sum:,.0f}")
+                with col2:
+                    st.metric("Average Daily Visitors", f"{avg_daily:,.0f}")
+                with col3:
+                    growth_rate = ((future_data['yhat'].iloc[-1] - forecast_data['y'].iloc[-1]) / forecast_data['y'].iloc[-1]) * 100
+                    st.metric("Growth Rate", f"{growth_rate:.1f}%")
+        
+        else:
+            st.warning("Not enough data for forecasting. Please select different filters.")
+        
+        # Fast engine, stored forecast or too little data: a Prophet job from an earlier rerun is no longer wanted
+        if job is None:
+            release_forecast()
+
+@st.fragment
+@traced('tab.regional')
+def render_regional(cube, cells, filters):
+    """Regional Analysis tab: region split, art forms and regional table"""
+    import plotly.express as px
+    
+    st.subheader("Regional Cultural Analysis")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Regional distribution
+        regional_data = get_aggregate('regional_visitors', cube, cells, filters)
         
-    if df is None:
-        st.error("""
-        Failed to load data from Snowflake. Please check:
-        1. Your Snowflake credentials in .env file
-        2. Network connectivity
-        3. Database and table permissions
+        fig = px.pie(regional_data, values='VISITORS', names='REGION',
+                    title='Visitors by Region',
+                    color_discrete_sequence=px.colors.qualitative.Set3)
+        show_chart(fig)
+    
+    with col2:
+        # Art forms popularity
+        art_data = get_aggregate('art_forms', cube, cells, filters)
+        
+        fig = px.bar(x=art_data['ART_FORM'], y=art_data['VISITORS'],
+                    title='Popular Art Forms',
+                    color_discrete_sequence=['#667eea'])
+        fig.update_layout(xaxis_tickangle=45)
+        show_chart(fig)
+    
+    # Regional insights
+    st.subheader("Regional Tourism Insights")
+    
+    regional_insights = get_aggregate('regional_insights', cube, cells, filters).set_index('REGION').round(2)
+    
+    regional_insights.columns = ['Total Visitors', 'Avg Visitors/Event', 'Total Revenue', 'Employment', 'High Tourism Events']
+    st.dataframe(regional_insights, use_container_width=True)
+
+@st.fragment
+@traced('tab.insights')
+def render_insights(kpis):
+    """Insights tab: peak tourism, tourism levels and economic impact"""
+    import plotly.express as px
+    
+    st.subheader("Cultural Tourism Insights & Recommendations")
+    
+    # Key insights
+    st.markdown("### 🔍 Key Insights")
+    
+    # Computed with the cards, see compute_kpis()
+    level_counts = kpis.level_counts
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.html(f"""
+        <div class="culture-card">
+            <h4>🏆 Peak Tourism</h4>
+            <p><strong>Month:</strong> {calendar.month_name[kpis.peak_month]}</p>
+            <p><strong>State:</strong> {kpis.peak_state}</p>
+            <p><strong>Event:</strong> {kpis.peak_event}</p>
+        </div>
+        """)
+    
+    with col2:
+        st.html(f"""
+        <div class="culture-card">
+            <h4>📊 Tourism Distribution</h4>
+            <p><strong>High Tourism Events:</strong> {level_counts.get('High', 0)}</p>
+            <p><strong>Medium Tourism Events:</strong> {level_counts.get('Medium', 0)}</p>
+            <p><strong>Low Tourism Events:</strong> {level_counts.get('Low', 0)}</p>
+        </div>
         """)
+    
+    # ''' Will be used if required '''
+    # with col2:
+    #     st.markdown("""
+    #     <div class="culture-card">
+    #         <h4>💡 Recommendations</h4>
+    #         <ul>
+    #             <li>Focus marketing efforts during off-peak months</li>
+    #             <li>Promote lesser-known cultural events</li>
+    #             <li>Develop cultural tourism packages</li>
+    #             <li>Invest in infrastructure for high-potential regions</li>
+    #             <li>Create cultural exchange programs</li>
+    #         </ul>
+    #     </div>
+    #     """, unsafe_allow_html=True)
+        
+    #     st.markdown(f"""
+    #     <div class="culture-card">
+    #         <h4>🎯 Focus Areas</h4>
+    #         <p>States with untapped potential:</p>
+    #         <ul>
+    #             {"".join([f"<li>{state} ({count} low-tourism events)</li>" for state, count in underperforming_states.head(3).items()])}
+    #         </ul>
+    #     </div>
+    #     """, unsafe_allow_html=True)
+    
+    # Economic impact
+    st.markdown("### 💰 Economic Impact Analysis")
+    
+    economic_data = kpis.economic
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        fig = px.scatter(economic_data, x='VISITORS', y='REVENUE_INR', 
+                       size='LOCAL_EMPLOYMENT', hover_name='STATE',
+                       title='Economic Impact by State',
+                       color_discrete_sequence=['#FF6B35'])
+        show_chart(fig)
+    
+    with col2:
+        fig = px.bar(economic_data.nlargest(10, 'Revenue_per_Visitor'), 
+                    x='STATE', y='Revenue_per_Visitor',
+                    title='Revenue per Visitor by State',
+                    color_discrete_sequence=['#F7931E'])
+        fig.update_layout(xaxis_tickangle=45)
+        show_chart(fig)
+
+def trace_panel(spans):
+    """Sidebar timing panel for the spans of this run, shown only when TOURISM_TRACE=1"""
+    tracer = get_tracer()
+    if not tracer.enabled:
         return
+    with st.sidebar.expander("⏱️ Timing (this run)"):
+        if not spans:
+            st.caption("No traced work in this run")
+            return
+        trace = pd.DataFrame(spans).sort_values('start')
+        trace['ms'] = (trace.pop('seconds') * 1000).round(1)
+        st.dataframe(trace.drop(columns=['start', 'thread']), hide_index=True)
+        summary = trace.groupby('name')['ms'].agg(['count', 'sum', 'max']).sort_values('sum', ascending=False)
+        st.dataframe(summary)
+        st.download_button("Download spans (JSON lines)", trace.to_json(orient='records', lines=True),
+                           file_name='trace.jsonl')
+        st.download_button("Download totals (Prometheus)", tracer.prometheus_text(), file_name='tourism.prom')
+
+def import_modules(modules):
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            print(f"Pre-warming {module} failed: {e}")
+
+@st.cache_resource
+def prewarm_imports():
+    """Import the plotting and forecasting stacks in the background, once per process, so later tabs find them loaded"""
+    thread = threading.Thread(target=import_modules, args=(PREWARM_MODULES,), name='prewarm-imports', daemon=True)
+    thread.start()
+    return thread
+
+def load_catalog():
+    """Sidebar filter options; built from the loaded data when they cannot be fetched on their own"""
+    try:
+        return get_dimension_catalog()
+    except Exception:
+        dataset = get_dataset_holder().current()
+        if dataset is None:
+            return None
+        # The cube's cells hold every state, event and year, and exist for streamed datasets too
+        return dataset.derived('catalog', lambda df: DimensionCatalog.from_frame(dataset.derived('cube', Cube).cells))
+
+def show_load_error():
+    st.error("""
+    Failed to load data from Snowflake. Please check:
+    1. Your Snowflake credentials in .env file
+    2. Network connectivity
+    3. Database and table permissions
+    """)
+
+def main():
+    # Header
+    st.html('<h1 class="main-header">🏛️ Cultural Tourism Dashboard - India</h1>')
     
-    # Sidebar
+    # Sidebar; its options come from the dimension catalog, so it renders before the events table loads
     st.sidebar.image("https://upload.wikimedia.org/wikipedia/en/4/41/Flag_of_India.svg", width=100)
     st.sidebar.markdown("## 🎭 Cultural Tourism Analytics")
     
-    # Filters
+    # Filters; event and year options narrow to those occurring with the other selections
+    catalog = load_catalog()
+    if catalog is None:
+        show_load_error()
+        return
     selected_state = st.sidebar.selectbox(
         "Select State",
-        ['All'] + sorted(df['STATE'].unique().tolist())
+        ['All'] + catalog.values('STATE'),
+        key='filter_state'
     )
     
     selected_event = st.sidebar.selectbox(
         "Select Event Type",
-        ['All'] + sorted(df['EVENT'].unique().tolist())
+        ['All'] + catalog.values('EVENT', STATE=selected_state),
+        key='filter_event'
     )
     
     selected_year = st.sidebar.selectbox(
         "Select Year",
-        ['All'] + sorted(df['YEAR'].unique().tolist())
+        ['All'] + catalog.values('YEAR', STATE=selected_state, EVENT=selected_event),
+        key='filter_year'
     )
     
-    # Filter data
-    filtered_df = df.copy()
-    if selected_state != 'All':
-        filtered_df = filtered_df[filtered_df['STATE'] == selected_state]
-    if selected_event != 'All':
-        filtered_df = filtered_df[filtered_df['EVENT'] == selected_event]
-    if selected_year != 'All':
-        filtered_df = filtered_df[filtered_df['YEAR'] == selected_year]
+    # Reload the shared table; sessions keep the current version until the new one is swapped in
+    if st.sidebar.button("🔄 Refresh data", key='refresh_data'):
+        get_dataset_holder().invalidate()
     
-    if filtered_df.empty:
+    # Load data
+    with st.spinner('Loading cultural tourism data from Snowflake...'):
+        dataset = get_dataset_holder().current()
+        
+    if dataset is None:
+        show_load_error()
+        return
+    
+    # Slice the rollup cube; every card and chart below is re-summed from these cells
+    cube = dataset.derived('cube', Cube)
+    cells = cube.slice(STATE=selected_state, EVENT=selected_event, YEAR=selected_year)
+    
+    if cells.empty:
         st.warning("No data available for the selected filters. Please try different filter combinations.")
         return
     
-    # Main dashboard
+    filters = {'state': selected_state, 'event': selected_event, 'year': selected_year}
+    
+    # Main dashboard; the cards and the Insights tab share one pass over the cells
+    kpis = compute_kpis(cells, cube.engine)
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_visitors = filtered_df['VISITORS'].sum()
+        total_visitors = kpis.visitors
         st.html(f"""
         <div class="metric-card">
             <h3 class="matric-card-h3">👥 Total Visitors</h3>
@@ -257,7 +705,7 @@ def main():
         """)
     
     with col2:
-        total_events = len(filtered_df)
+        total_events = kpis.events
         st.html(f"""
         <div class="metric-card">
             <h3 class="matric-card-h3">🎪 Total Events</h3>
@@ -266,7 +714,7 @@ def main():
         """)
     
     with col3:
-        total_revenue = filtered_df['REVENUE_INR'].sum()
+        total_revenue = kpis.revenue
         st.html(f"""
         <div class="metric-card">
             <h3 class="matric-card-h3">💰 Revenue (₹)</h3>
@@ -275,7 +723,7 @@ def main():
         """)
     
     with col4:
-        employment = filtered_df['LOCAL_EMPLOYMENT'].sum()
+        employment = kpis.employment
         st.html(f"""
         <div class="metric-card">
             <h3 class="matric-card-h3">👷 Employment</h3>
@@ -283,302 +731,32 @@ def main():
         </div>
         """)
     
-    # Tabs
-    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Overview", "📅 Cultural Calendar", "🔮 Forecasting", "🗺️ Regional Analysis", "📈 Insights"])
+    # Tabs; only the open tab runs, and each tab reruns on its own when its controls change
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 Overview", "📅 Cultural Calendar", "🔮 Forecasting", "🗺️ Regional Analysis", "📈 Insights"],
+                                           key='active_tab', on_change='rerun')
     
     with tab1:
-        st.subheader("Tourism Trends Overview")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Monthly visitors trend
-            monthly_data = filtered_df.groupby(['YEAR', 'MONTH'])['VISITORS'].sum().reset_index()
-            monthly_data['Date'] = pd.to_datetime(monthly_data[['YEAR', 'MONTH']].assign(day=1))
-            
-            fig = px.line(monthly_data, x='Date', y='VISITORS', 
-                         title='Monthly Visitor Trends',
-                         color_discrete_sequence=['#FF6B35'])
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            # Top events by visitors
-            event_stats = filtered_df.groupby('EVENT')['VISITORS'].sum().sort_values(ascending=False).head(10)
-            
-            fig = px.bar(x=event_stats.values, y=event_stats.index, 
-                        orientation='h',
-                        title='Top Events by Visitors',
-                        color_discrete_sequence=['#F7931E'])
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
-        
-        # State-wise analysis
-        st.subheader("State-wise Cultural Tourism")
-        state_stats = filtered_df.groupby('STATE').agg({
-            'VISITORS': 'sum',
-            'REVENUE_INR': 'sum',
-            'LOCAL_EMPLOYMENT': 'sum',
-            'EVENT': 'count'
-        }).round(2)
-        state_stats.columns = ['Total Visitors', 'Revenue (₹)', 'Employment', 'Total Events']
-        st.dataframe(state_stats.sort_values('Total Visitors', ascending=False), use_container_width=True)
+        if tab1.open:
+            render_overview(cube, cells, filters)
     
     with tab2:
-        st.subheader("Cultural Calendar & Seasonality")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Seasonal patterns
-            seasonal_data = filtered_df.groupby('MONTH')['VISITORS'].mean().reset_index()
-            months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
-                     'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-            seasonal_data['Month_Name'] = [months[i-1] for i in seasonal_data['MONTH']]
-            
-            fig = px.bar(seasonal_data, x='Month_Name', y='VISITORS',
-                        title='Average Visitors by Month',
-                        color='VISITORS',
-                        color_continuous_scale='Oranges')
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            # Weekly patterns
-            filtered_df['Weekday'] = filtered_df['Date'].dt.day_name()
-            weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-            weekly_data = filtered_df.groupby('Weekday')['VISITORS'].mean().reindex(weekday_order)
-            
-            fig = px.bar(x=weekly_data.index, y=weekly_data.values,
-                        title='Average Visitors by Day of Week',
-                        color_discrete_sequence=['#764ba2'])
-            st.plotly_chart(fig, use_container_width=True)
-        
-        # Cultural event calendar heatmap
-        st.subheader("Event Calendar Heatmap")
-        
-        # Create a more detailed calendar view
-        filtered_df['Day'] = filtered_df['Date'].dt.day
-        heatmap_data = filtered_df.groupby(['MONTH', 'Day'])['VISITORS'].sum().reset_index()
-        heatmap_pivot = heatmap_data.pivot(index='MONTH', columns='Day', values='VISITORS').fillna(0)
-        
-        fig = px.imshow(heatmap_pivot, 
-                       title="Cultural Tourism Intensity Calendar",
-                       color_continuous_scale='Oranges',
-                       aspect='auto')
-        fig.update_layout(height=500)
-        st.plotly_chart(fig, use_container_width=True)
+        if tab2.open:
+            render_calendar(cube, cells, filters)
     
     with tab3:
-        st.subheader("Tourism Forecasting with Prophet")
-        
-        col1, col2 = st.columns([1, 3])
-        
-        with col1:
-            forecast_state = st.selectbox("Forecast State", ['All'] + sorted(df['STATE'].unique().tolist()), key='forecast_state')
-            forecast_event = st.selectbox("Forecast Event", ['All'] + sorted(df['EVENT'].unique().tolist()), key='forecast_event')
-            forecast_days = st.slider("Forecast Days", 30, 365, 180)
-        
-        with col2:
-            with st.spinner('Generating forecast...'):
-                forecast_data = prepare_forecast_data(df, forecast_state, forecast_event)
-                
-                if len(forecast_data) > 30:  # Minimum data points for forecasting
-                    model, forecast = create_forecast(forecast_data, forecast_days)
-                    
-                    if model and forecast is not None:
-                        # Plot forecast
-                        fig = go.Figure()
-                        
-                        # Historical data
-                        fig.add_trace(go.Scatter(
-                            x=forecast_data['ds'],
-                            y=forecast_data['y'],
-                            mode='markers',
-                            name='Historical',
-                            marker=dict(color='#FF6B35', size=4)
-                        ))
-                        
-                        # Forecast
-                        future_data = forecast[forecast['ds'] > forecast_data['ds'].max()]
-                        fig.add_trace(go.Scatter(
-                            x=future_data['ds'],
-                            y=future_data['yhat'],
-                            mode='lines',
-                            name='Forecast',
-                            line=dict(color='#F7931E', width=2)
-                        ))
-                        
-                        # Confidence intervals
-                        fig.add_trace(go.Scatter(
-                            x=future_data['ds'],
-                            y=future_data['yhat_upper'],
-                            fill=None,
-                            mode='lines',
-                            line_color='rgba(0,0,0,0)',
-                            showlegend=False
-                        ))
-                        
-                        fig.add_trace(go.Scatter(
-                            x=future_data['ds'],
-                            y=future_data['yhat_lower'],
-                            fill='tonexty',
-                            mode='lines',
-                            line_color='rgba(0,0,0,0)',
-                            name='Confidence Interval',
-                            fillcolor='rgba(247, 147, 30, 0.2)'
-                        ))
-                        
-                        fig.update_layout(
-                            title=f'Tourism Forecast - {forecast_state} - {forecast_event}',
-                            xaxis_title='Date',
-                            yaxis_title='Visitors',
-                            height=500
-                        )
-                        
-                        st.plotly_chart(fig, use_container_width=True)
-                        
-                        # Forecast summary
-                        future_sum = future_data['yhat'].sum()
-                        avg_daily = future_sum / len(future_data)
-                        
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            st.metric("Predicted Total Visitors", f"{future_sum:,.0f}")
-                        with col2:
-                            st.metric("Average Daily Visitors", f"{avg_daily:,.0f}")
-                        with col3:
-                            growth_rate = ((future_data['yhat'].iloc[-1] - forecast_data['y'].iloc[-1]) / forecast_data['y'].iloc[-1]) * 100
-                            st.metric("Growth Rate", f"{growth_rate:.1f}%")
-                    
-                else:
-                    st.warning("Not enough data for forecasting. Please select different filters.")
+        if tab3.open:
+            render_forecasting(dataset, catalog)
+        else:
+            # A Prophet fit this session started is not waited on once the tab is closed
+            release_forecast()
     
     with tab4:
-        st.subheader("Regional Cultural Analysis")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Regional distribution
-            regional_data = filtered_df.groupby('REGION')['VISITORS'].sum().reset_index()
-            
-            fig = px.pie(regional_data, values='VISITORS', names='REGION',
-                        title='Visitors by Region',
-                        color_discrete_sequence=px.colors.qualitative.Set3)
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            # Art forms popularity
-            art_data = filtered_df.groupby('ART_FORM')['VISITORS'].sum().sort_values(ascending=False).head(8)
-            
-            fig = px.bar(x=art_data.index, y=art_data.values,
-                        title='Popular Art Forms',
-                        color_discrete_sequence=['#667eea'])
-            fig.update_layout(xaxis_tickangle=45)
-            st.plotly_chart(fig, use_container_width=True)
-        
-        # Regional insights
-        st.subheader("Regional Tourism Insights")
-        
-        regional_insights = filtered_df.groupby('REGION').agg({
-            'VISITORS': ['sum', 'mean'],
-            'REVENUE_INR': 'sum',
-            'LOCAL_EMPLOYMENT': 'sum',
-            'TOURISM_LEVEL': lambda x: (x == 'High').sum()
-        }).round(2)
-        
-        regional_insights.columns = ['Total Visitors', 'Avg Visitors/Event', 'Total Revenue', 'Employment', 'High Tourism Events']
-        st.dataframe(regional_insights, use_container_width=True)
+        if tab4.open:
+            render_regional(cube, cells, filters)
     
     with tab5:
-        st.subheader("Cultural Tourism Insights & Recommendations")
-        
-        # Key insights
-        st.markdown("### 🔍 Key Insights")
-        
-        # Calculate insights
-        peak_month = filtered_df.groupby('MONTH')['VISITORS'].sum().idxmax()
-        peak_state = filtered_df.groupby('STATE')['VISITORS'].sum().idxmax()
-        peak_event = filtered_df.groupby('EVENT')['VISITORS'].sum().idxmax()
-        
-        underperforming = filtered_df[filtered_df['TOURISM_LEVEL'] == 'Low']
-        underperforming_states = underperforming['STATE'].value_counts().head(3)
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.html(f"""
-            <div class="culture-card">
-                <h4>🏆 Peak Tourism</h4>
-                <p><strong>Month:</strong> {calendar.month_name[peak_month]}</p>
-                <p><strong>State:</strong> {peak_state}</p>
-                <p><strong>Event:</strong> {peak_event}</p>
-            </div>
-            """)
-        
-        with col2:
-            st.html(f"""
-            <div class="culture-card">
-                <h4>📊 Tourism Distribution</h4>
-                <p><strong>High Tourism Events:</strong> {len(filtered_df[filtered_df['TOURISM_LEVEL'] == 'High'])}</p>
-                <p><strong>Medium Tourism Events:</strong> {len(filtered_df[filtered_df['TOURISM_LEVEL'] == 'Medium'])}</p>
-                <p><strong>Low Tourism Events:</strong> {len(filtered_df[filtered_df['TOURISM_LEVEL'] == 'Low'])}</p>
-            </div>
-            """)
-        
-        # ''' Will be used if required '''
-        # with col2:
-        #     st.markdown("""
-        #     <div class="culture-card">
-        #         <h4>💡 Recommendations</h4>
-        #         <ul>
-        #             <li>Focus marketing efforts during off-peak months</li>
-        #             <li>Promote lesser-known cultural events</li>
-        #             <li>Develop cultural tourism packages</li>
-        #             <li>Invest in infrastructure for high-potential regions</li>
-        #             <li>Create cultural exchange programs</li>
-        #         </ul>
-        #     </div>
-        #     """, unsafe_allow_html=True)
-            
-        #     st.markdown(f"""
-        #     <div class="culture-card">
-        #         <h4>🎯 Focus Areas</h4>
-        #         <p>States with untapped potential:</p>
-        #         <ul>
-        #             {"".join([f"<li>{state} ({count} low-tourism events)</li>" for state, count in underperforming_states.head(3).items()])}
-        #         </ul>
-        #     </div>
-        #     """, unsafe_allow_html=True)
-        
-        # Economic impact
-        st.markdown("### 💰 Economic Impact Analysis")
-        
-        economic_data = filtered_df.groupby('STATE').agg({
-            'REVENUE_INR': 'sum',
-            'LOCAL_EMPLOYMENT': 'sum',
-            'VISITORS': 'sum'
-        }).reset_index()
-        
-        economic_data['Revenue_per_Visitor'] = economic_data['REVENUE_INR'] / economic_data['VISITORS']
-        economic_data['Employment_per_1000_Visitors'] = (economic_data['LOCAL_EMPLOYMENT'] / economic_data['VISITORS']) * 1000
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            fig = px.scatter(economic_data, x='VISITORS', y='REVENUE_INR', 
-                           size='LOCAL_EMPLOYMENT', hover_name='STATE',
-                           title='Economic Impact by State',
-                           color_discrete_sequence=['#FF6B35'])
-            st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            fig = px.bar(economic_data.nlargest(10, 'Revenue_per_Visitor'), 
-                        x='STATE', y='Revenue_per_Visitor',
-                        title='Revenue per Visitor by State',
-                        color_discrete_sequence=['#F7931E'])
-            fig.update_layout(xaxis_tickangle=45)
-            st.plotly_chart(fig, use_container_width=True)
+        if tab5.open:
+            render_insights(kpis)
 
     # Footer
     st.markdown("---")
@@ -588,7 +766,14 @@ def main():
         <p>Built with Streamlit • Prophet • Plotly</p>
     </div>
     """)
+    
+    # The page is out; load what the other tabs will need
+    prewarm_imports()
 
 if __name__ == "__main__":
     import calendar
-    main()
\ No newline at end of file
+    get_tracer().begin_run()
+    try:
+        main()
+    finally:
+        trace_panel(get_tracer().end_run())
\ No newline at end of file
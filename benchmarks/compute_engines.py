@@ -0,0 +1,97 @@
+"""
+Compare the compute engines on the dashboard's aggregations, and check they agree
+
+For each --rows size the synthetic dataset is loaded and built once; every
+engine then builds the cube, evaluates each DASHBOARD_AGGREGATES entry over the
+event rows (the non-pushdown run_aggregate() path) and over the cube cells.
+Each result is checked against the pandas engine before it is timed.
+
+Usage:
+    python -m benchmarks.compute_engines --rows 100000 1000000 --output compute_engines.json
+"""
+
+import argparse
+import json
+import os
+
+import pandas as pd
+
+from benchmarks.dashboard import DATA_DIR, open_dataset, timed
+from benchmarks.synthetic_data import write_csv
+from compute_engine import ENGINES, create_engine
+from cube import Cube
+from frame_builder import build_frame
+from snowflake_utils import DASHBOARD_AGGREGATES
+
+
+def assert_same(expected, actual, label):
+    """Same rows and values; dtypes may differ (e.g. int32 vs int64 date parts)"""
+    try:
+        pd.testing.assert_frame_equal(expected.reset_index(drop=True), actual.reset_index(drop=True),
+                                      check_dtype=False, check_categorical=False, rtol=1e-9)
+    except AssertionError as error:
+        raise AssertionError(f"{label} differs from pandas: {error}") from None
+
+
+def run_size(rows, args):
+    csv_path = os.path.join(args.data_dir, f"synthetic_{rows}_{args.events}_{args.seed}.csv")
+    if not os.path.exists(csv_path):
+        print(f"Generating {rows:,} rows")
+        write_csv(csv_path, rows, args.events, args.seed)
+    df = build_frame(open_dataset(csv_path, 'offline').load_cultural_data())
+
+    stages, expected = {}, {}
+    for name in args.engines:
+        engine = create_engine(name)
+
+        def record(stage, fn):
+            result, median, _ = timed(fn, args.repeat)
+            stages.setdefault(stage, {})[name] = round(median, 6)
+            if name == 'pandas':
+                expected[stage] = result
+            elif stage != 'cube':
+                assert_same(expected[stage], result, f"{stage} on {name}")
+            return result
+
+        cube = record('cube', lambda: Cube(df, engine=engine))
+        if name == 'pandas':
+            expected['cells'] = cube.cells
+        else:
+            assert_same(expected['cells'], cube.cells, f"cube cells on {name}")
+        for aggregate_name, aggregate in DASHBOARD_AGGREGATES.items():
+            record(f'rows[{aggregate_name}]', lambda: engine.aggregate(aggregate, df))
+            record(f'cube[{aggregate_name}]', lambda: cube.evaluate(aggregate, cube.cells))
+
+    return {'rows': rows, 'stages': stages}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the compute engines on the dashboard's aggregations")
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--engines', nargs='+', choices=sorted(ENGINES), default=['pandas', 'duckdb'],
+                        help="Engines to time; pandas is always run first as the reference")
+    parser.add_argument('--events', type=int, default=200, help="Distinct events in the synthetic data")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per stage; the median is reported")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--output', default=None, help="Write results as JSON")
+    args = parser.parse_args()
+    args.engines = ['pandas'] + [name for name in args.engines if name != 'pandas']
+
+    report = {'engines': args.engines, 'results': []}
+    for rows in args.rows:
+        result = run_size(rows, args)
+        report['results'].append(result)
+        table = pd.DataFrame(result['stages']).T
+        for name in args.engines[1:]:
+            table[f'{name}_speedup'] = (table['pandas'] / table[name]).round(2)
+        print(f"\n{rows:,} rows (all results match pandas)")
+        print(table.to_string())
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Time the dashboard's data path on synthetic datasets of increasing size
+
+For each --rows size a synthetic CSV is generated once (cached under
+--data-dir) and served through the local or offline backend. The stages are
+the same calls app.py makes: loading and build_frame() as in load_data(),
+sidebar filtering, each tab's aggregates, prepare_forecast_data() and
+create_forecast(). Streamlit caching is bypassed, so every stage does its
+full work.
+
+Usage:
+    python -m benchmarks.dashboard --rows 10000 100000 1000000 --output before.json
+    python -m benchmarks.dashboard --rows 10000 100000 1000000 --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import write_csv
+from cube import Cube
+from fast_forecast import fit_fourier
+from filter_index import FilterIndex
+from forecasting import daily_series, fit_prophet, predict
+from frame_builder import build_frame
+from kpis import compute_kpis
+from snowflake_utils import ConnectionPool, DASHBOARD_AGGREGATES, LocalBackend, SnowflakeConnection
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'benchmarks')
+
+# Aggregates each tab draws, as in app.py's render_* fragments
+TAB_AGGREGATES = {
+    'overview': ['monthly_trend', 'top_events', 'state_stats'],
+    'calendar': ['seasonal_means', 'weekday_means', 'calendar_heatmap'],
+    'regional': ['regional_visitors', 'art_forms', 'regional_insights'],
+    'insights': [],
+}
+
+FORECAST_PERIODS = 180
+
+
+def timed(fn, repeat):
+    """(result of the last call, median seconds, min seconds) over `repeat` calls"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return result, statistics.median(times), min(times)
+
+
+def open_dataset(csv_path, backend):
+    """SnowflakeConnection-compatible connection serving csv_path through the chosen backend"""
+    if backend == 'offline':
+        from offline_backend import OfflineConnection, OfflineStore
+        return OfflineConnection(OfflineStore([csv_path], os.path.join(os.path.dirname(csv_path), 'offline')))
+    return SnowflakeConnection(pool=ConnectionPool(LocalBackend(csv_path), max_size=1))
+
+
+def render_tab(tab, cube, cells):
+    """The cube work a tab does for one selection"""
+    results = [cube.evaluate(DASHBOARD_AGGREGATES[name], cells) for name in TAB_AGGREGATES[tab]]
+    if tab == 'calendar':
+        results.append(results[-1].pivot(index='MONTH', columns='DAY', values='VISITORS').fillna(0))
+    if tab == 'insights':
+        # Cards and Insights share one compute_kpis() pass
+        results.append(compute_kpis(cells, cube.engine))
+    return results
+
+
+def run_size(rows, args):
+    csv_path = os.path.join(args.data_dir, f"synthetic_{rows}_{args.events}_{args.seed}.csv")
+    if not os.path.exists(csv_path):
+        print(f"Generating {rows:,} rows")
+        write_csv(csv_path, rows, args.events, args.seed)
+
+    stages = {}
+
+    def record(name, fn, repeat=args.repeat):
+        result, median, best = timed(fn, repeat)
+        stages[name] = {'seconds': round(median, 6), 'min_seconds': round(best, 6)}
+        return result
+
+    sf = open_dataset(csv_path, args.backend)
+    # The first load builds the backend's copy of the CSV (sqlite table or Arrow file)
+    record('backend_setup', lambda: sf.load_cultural_data(), repeat=1)
+    raw = record('load', lambda: sf.load_cultural_data())
+    df = record('build_frame', lambda: build_frame(raw.copy()))
+    memory = int(df.memory_usage(deep=True).sum())
+
+    index = record('filter_index', lambda: FilterIndex(df), repeat=1)
+    state = df['STATE'].value_counts().index[0]
+    event = df.loc[df['STATE'] == state, 'EVENT'].value_counts().index[0]
+    year = int(df['YEAR'].max())
+    record('sidebar_filter', lambda: index.filter(STATE=state, EVENT='All', YEAR=year))
+
+    cube = record('cube', lambda: Cube(df), repeat=1)
+    # TOURISM_STREAMING=1: the same cube folded from result batches, without the full frame
+    record('stream_cube', lambda: Cube.from_frames(build_frame(frame) for frame in sf.iter_cultural_data()), repeat=1)
+    selections = {'all': {}, 'state_year': {'STATE': state, 'YEAR': year}}
+    for label, selection in selections.items():
+        cells = record(f'cube_slice[{label}]', lambda: cube.slice(**selection))
+        for tab in TAB_AGGREGATES:
+            record(f'tab_{tab}[{label}]', lambda: render_tab(tab, cube, cells))
+
+    histories = {}
+    for label, (state_choice, event_choice) in {'all': ('All', 'All'), 'event': (state, event)}.items():
+        histories[label] = record(f'prepare_forecast_data[{label}]', lambda: daily_series(
+            index.filter(STATE=state_choice, EVENT=event_choice)))
+        record(f'create_forecast_fast[{label}]', lambda: predict(fit_fourier(histories[label]), FORECAST_PERIODS))
+        if args.prophet:
+            record(f'create_forecast_prophet[{label}]',
+                   lambda: predict(fit_prophet(histories[label]), FORECAST_PERIODS), repeat=1)
+
+    return {'rows': rows, 'frame_bytes': memory, 'stages': stages}
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(DATA_DIR)).stdout.strip()
+    except OSError:
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'pandas': pd.__version__,
+            'numpy': np.__version__, 'machine': platform.machine(), 'cpus': os.cpu_count()}
+
+
+def compare(previous, current):
+    """Stage-by-stage table of previous vs current median seconds per size"""
+    before = {(result['rows'], stage): timing['seconds']
+              for result in previous['results'] for stage, timing in result['stages'].items()}
+    lines = []
+    for result in current['results']:
+        for stage, timing in result['stages'].items():
+            old = before.get((result['rows'], stage))
+            if old is not None:
+                lines.append({'rows': result['rows'], 'stage': stage, 'before': old, 'after': timing['seconds'],
+                              'speedup': round(old / max(timing['seconds'], 1e-9), 2)})
+    return pd.DataFrame(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's data path on synthetic data")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help="Dataset sizes (10K to 50M)")
+    parser.add_argument('--backend', choices=['local', 'offline'], default='local',
+                        help="'offline' avoids loading sqlite, which is slow beyond a few million rows")
+    parser.add_argument('--events', type=int, default=200, help="Distinct events in the synthetic data")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per stage; the median is reported")
+    parser.add_argument('--prophet', action='store_true', help="Also time create_forecast() with Prophet")
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--output', default=None, help="Write results as JSON")
+    parser.add_argument('--compare', default=None, help="Earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    report = {'created_at': time.time(), 'backend': args.backend, 'events': args.events, 'seed': args.seed,
+              'environment': environment(), 'results': []}
+    for rows in args.rows:
+        result = run_size(rows, args)
+        report['results'].append(result)
+        print(f"\n{rows:,} rows ({result['frame_bytes'] / 1e6:.1f} MB in memory)")
+        print(pd.DataFrame(result['stages']).T.to_string())
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            print("\n" + compare(json.load(f), report).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Compare the fast NumPy forecasting engine with Prophet on the dashboard's series
+
+Every series the forecast tab can show is split into a training history and a
+holdout of its last --holdout-days; both engines fit the history and are scored
+on the holdout. Runs against the bundled sample data unless TOURISM_BACKEND says otherwise.
+
+Usage:
+    python -m benchmarks.forecast_engines --holdout-days 365 --output forecast_engines.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault('TOURISM_BACKEND', 'local')
+
+from fast_forecast import fit_many  # noqa: E402
+from forecast_batch import enumerate_series, load_dataset  # noqa: E402
+from forecasting import MIN_HISTORY_POINTS, fit_prophet  # noqa: E402
+
+
+def split_series(series, holdout_days):
+    """(state, event, train, test) for every series with enough history left after the holdout"""
+    for state, event, history in series:
+        cutoff = history['ds'].max() - pd.Timedelta(days=holdout_days)
+        train, test = history[history['ds'] <= cutoff], history[history['ds'] > cutoff]
+        if len(train) > MIN_HISTORY_POINTS and len(test) > 0:
+            yield state, event, train, test
+
+
+def score(forecast, test):
+    """Holdout error and interval coverage of a forecast evaluated at the test dates"""
+    actual = test['y'].to_numpy(dtype=float)
+    yhat = forecast['yhat'].to_numpy()
+    inside = (actual >= forecast['yhat_lower'].to_numpy()) & (actual <= forecast['yhat_upper'].to_numpy())
+    return {
+        'mae': float(np.abs(actual - yhat).mean()),
+        'mape_%': float(100 * (np.abs(actual - yhat) / np.maximum(actual, 1)).mean()),
+        'coverage_%': float(100 * inside.mean()),
+    }
+
+
+def run_prophet(splits):
+    logging.getLogger('cmdstanpy').disabled = True
+    results = []
+    for state, event, train, test in splits:
+        started = time.perf_counter()
+        forecast = fit_prophet(train).predict(test[['ds']])
+        results.append({'state': state, 'event': event, 'seconds': time.perf_counter() - started,
+                        **score(forecast, test)})
+    return results
+
+
+def run_fast(splits):
+    started = time.perf_counter()
+    models = fit_many([train for _, _, train, _ in splits])
+    fit_seconds = time.perf_counter() - started
+    results = []
+    for model, (state, event, train, test) in zip(models, splits):
+        started = time.perf_counter()
+        forecast = model.predict(test[['ds']])
+        results.append({'state': state, 'event': event, 'seconds': time.perf_counter() - started,
+                        **score(forecast, test)})
+    return results, fit_seconds
+
+
+def summarize(results, total_seconds):
+    frame = pd.DataFrame(results)
+    return {
+        'series': len(frame),
+        'total_seconds': round(total_seconds, 4),
+        'mean_seconds_per_series': round(total_seconds / max(len(frame), 1), 5),
+        'median_mae': round(float(frame['mae'].median()), 1),
+        'median_mape_%': round(float(frame['mape_%'].median()), 1),
+        'mean_coverage_%': round(float(frame['coverage_%'].mean()), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fast forecasting engine against Prophet")
+    parser.add_argument('--holdout-days', type=int, default=365, help="Days at the end of each series held out")
+    parser.add_argument('--limit', type=int, default=None, help="Only benchmark the first N series")
+    parser.add_argument('--output', default=None, help="Write the summary and per-series results as JSON")
+    args = parser.parse_args()
+
+    splits = list(split_series(enumerate_series(load_dataset()), args.holdout_days))[:args.limit]
+    print(f"Benchmarking {len(splits)} series with a {args.holdout_days}-day holdout")
+
+    fast_results, fit_seconds = run_fast(splits)
+    fast_total = fit_seconds + sum(result['seconds'] for result in fast_results)
+    prophet_results = run_prophet(splits)
+    prophet_total = sum(result['seconds'] for result in prophet_results)
+
+    summary = {'fast': summarize(fast_results, fast_total), 'prophet': summarize(prophet_results, prophet_total)}
+    summary['speedup'] = round(prophet_total / max(fast_total, 1e-9), 1)
+    print(pd.DataFrame({engine: summary[engine] for engine in ('fast', 'prophet')}).to_string())
+    print(f"Fast engine is {summary['speedup']}x faster")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'holdout_days': args.holdout_days, 'summary': summary,
+                       'fast': fast_results, 'prophet': prophet_results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Time the dashboard's cold start: what each import costs, and how long until the first metric card
+
+Every measurement runs in a fresh interpreter, as after a deploy. The first
+metric card is timed from interpreter start to the script's first metric-card
+st.html() call, with the app run headless through Streamlit's AppTest; the full
+first run (including the open tab's charts) is reported alongside.
+
+Usage:
+    python -m benchmarks.startup --output before.json
+    python -m benchmarks.startup --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, 'app.py')
+
+# Third-party stacks first, then the dashboard modules app.py imports at startup
+IMPORT_MODULES = ['streamlit', 'pandas', 'pyarrow', 'plotly.express', 'prophet', 'snowflake.connector',
+                  'snowflake_utils', 'forecasting', 'fast_forecast', 'chart_prep', 'cube', 'dimension_catalog']
+
+FIRST_RUN = """
+import json, time
+started = time.perf_counter()
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+marks = {}
+html = st.html
+
+def timed_html(body, *args, **kwargs):
+    if 'class="metric-card"' in body and 'first_card' not in marks:
+        marks['first_card'] = time.perf_counter() - started
+    return html(body, *args, **kwargs)
+
+st.html = timed_html
+app = AppTest.from_file(%r, default_timeout=600).run()
+marks['first_run'] = time.perf_counter() - started
+marks['exceptions'] = [exception.value for exception in app.exception]
+print(json.dumps(marks))
+"""
+
+
+def import_seconds(module):
+    """Cumulative import time of `module` in a fresh interpreter, from python -X importtime"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, cwd=ROOT)
+    for line in reversed(result.stderr.splitlines()):
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1e6
+    raise RuntimeError(f"Could not import {module}: {result.stderr[-500:]}")
+
+
+def first_run(backend):
+    """Seconds from interpreter start to the first metric card and to the end of the first script run"""
+    env = {**os.environ, 'TOURISM_BACKEND': backend}
+    result = subprocess.run([sys.executable, '-c', FIRST_RUN % APP_PATH], capture_output=True, text=True,
+                            cwd=ROOT, env=env)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    marks = json.loads(result.stdout.strip().splitlines()[-1])
+    if marks['exceptions']:
+        raise RuntimeError(f"The app raised: {marks['exceptions']}")
+    return marks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the dashboard's cold start")
+    parser.add_argument('--backend', choices=['local', 'offline', 'snowflake'], default='local')
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh interpreters per measurement; the median is reported")
+    parser.add_argument('--output', default=None, help="Write results as JSON")
+    parser.add_argument('--compare', default=None, help="Earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    imports = {module: statistics.median(import_seconds(module) for _ in range(args.repeat))
+               for module in IMPORT_MODULES}
+    runs = [first_run(args.backend) for _ in range(args.repeat)]
+    startup = {stage: statistics.median(run[stage] for run in runs) for stage in ('first_card', 'first_run')}
+    report = {'backend': args.backend, 'imports': imports, 'startup': startup}
+
+    print(pd.Series(imports, name='import seconds').round(3).to_string())
+    print(pd.Series(startup, name='seconds').round(3).to_string())
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        rows = [{'stage': stage, 'before': previous[section].get(stage), 'after': seconds}
+                for section in ('imports', 'startup') for stage, seconds in report[section].items()]
+        table = pd.DataFrame(rows).dropna()
+        table['speedup'] = (table['before'] / table['after']).round(2)
+        print("\n" + table.round(3).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Synthetic cultural tourism events in the schema of data/tourism_data_sample.csv
+
+Each event belongs to one state, art form and region and peaks in its own
+festival season, like the sample. Visitors follow that season, a weekend lift
+and year-on-year growth; revenue, employment and tourism level derive from
+visitors with the sample's ratios and thresholds.
+
+Usage:
+    python -m benchmarks.synthetic_data --rows 1000000 --output data/benchmarks/synthetic_1000000.csv
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+STATE_REGIONS = {
+    'Andhra Pradesh': 'South', 'Arunachal Pradesh': 'North East', 'Assam': 'North East', 'Bihar': 'East',
+    'Chhattisgarh': 'Central', 'Goa': 'West', 'Gujarat': 'West', 'Haryana': 'North',
+    'Himachal Pradesh': 'North', 'Jharkhand': 'East', 'Karnataka': 'South', 'Kerala': 'South',
+    'Madhya Pradesh': 'Central', 'Maharashtra': 'West', 'Manipur': 'North East', 'Meghalaya': 'North East',
+    'Mizoram': 'North East', 'Nagaland': 'North East', 'Odisha': 'East', 'Punjab': 'North',
+    'Rajasthan': 'West', 'Sikkim': 'North East', 'Tamil Nadu': 'South', 'Telangana': 'South',
+    'Tripura': 'North East', 'Uttar Pradesh': 'North', 'Uttarakhand': 'North', 'West Bengal': 'East',
+    'Andaman and Nicobar Islands': 'South', 'Chandigarh': 'North', 'Dadra and Nagar Haveli': 'West',
+    'Delhi': 'North', 'Jammu and Kashmir': 'North', 'Ladakh': 'North', 'Lakshadweep': 'South',
+    'Puducherry': 'South',
+}
+
+ART_FORMS = ['Classical Dance', 'Folk Dance', 'Traditional Music', 'Handicrafts', 'Theatre', 'Painting',
+             'Puppetry', 'Martial Arts', 'Textiles', 'Cuisine']
+
+# The sample's events keep their real state and art form; the rest are generated per state
+SAMPLE_EVENTS = [
+    ('Bastar Dussehra', 'Chhattisgarh', 'Folk Dance'), ('Bundi Utsav', 'Rajasthan', 'Traditional Music'),
+    ('Hornbill Festival', 'Nagaland', 'Folk Dance'), ('International Kite Festival', 'Gujarat', 'Handicrafts'),
+    ('Jal Mahotsav', 'Madhya Pradesh', 'Handicrafts'), ('Kankaria Carnival', 'Gujarat', 'Folk Dance'),
+    ('Khajuraho Dance Festival', 'Madhya Pradesh', 'Classical Dance'),
+    ('Konark Dance Festival', 'Odisha', 'Classical Dance'), ('Maha Kumbh Mela', 'Uttar Pradesh', 'Traditional Music'),
+    ('Orange Festival', 'Arunachal Pradesh', 'Folk Dance'), ('Rajgir Mahotsav', 'Bihar', 'Traditional Music'),
+    ('Rose Festival', 'Chandigarh', 'Folk Dance'), ('Shillong Cherry Blossom Festival', 'Meghalaya', 'Folk Dance'),
+    ('Surajkund Mela', 'Haryana', 'Handicrafts'),
+]
+
+COLUMNS = ['Date', 'State', 'Event', 'Art_Form', 'Visitors', 'Tourism_Level', 'Revenue_INR',
+           'Local_Employment', 'Month', 'Year', 'Quarter', 'Region']
+
+# Visitors below these are Low, then Medium, else High (the sample's boundaries)
+TOURISM_LEVELS = np.array(['Low', 'Medium', 'High'])
+LEVEL_THRESHOLDS = [1500, 4000]
+
+CHUNK_ROWS = 1_000_000
+
+
+def event_catalog(events=200, rng=None):
+    """(event, state, art form, region, peak month, base visitors) rows for `events` events"""
+    rng = rng or np.random.default_rng(0)
+    states = list(STATE_REGIONS)
+    catalog = list(SAMPLE_EVENTS[:events])
+    for i in range(len(catalog), events):
+        state = states[i % len(states)]
+        art_form = ART_FORMS[rng.integers(len(ART_FORMS))]
+        catalog.append((f"{state} {art_form} Utsav {i // len(states) + 1}", state, art_form))
+    peaks = rng.integers(1, 13, len(catalog))
+    bases = rng.lognormal(np.log(3500), 0.3, len(catalog))
+    return [(event, state, art_form, STATE_REGIONS[state], int(peak), float(base))
+            for (event, state, art_form), peak, base in zip(catalog, peaks, bases)]
+
+
+def generate_chunk(rows, catalog, rng, first_year=2016, last_year=2024):
+    """One Arrow table of `rows` events drawn from the catalog"""
+    names, states, art_forms, regions, peaks, bases = (np.array(column) for column in zip(*catalog))
+    event = rng.integers(len(catalog), size=rows)
+
+    # Most of an event's editions fall within a month of its peak, the rest anywhere in the year
+    in_season = rng.random(rows) < 0.8
+    month = np.where(in_season, (peaks[event] - 1 + rng.integers(-1, 2, rows)) % 12 + 1, rng.integers(1, 13, rows))
+    year = rng.integers(first_year, last_year + 1, rows)
+    months = (year - 1970) * 12 + month - 1
+    first = months.astype('datetime64[M]').astype('datetime64[D]')
+    length = (months + 1).astype('datetime64[M]').astype('datetime64[D]') - first
+    dates = first + (rng.random(rows) * length.astype(int)).astype(int)
+
+    weekday = (dates.astype(int) + 3) % 7  # 1970-01-01 was a Thursday; 0 is Monday
+    season = 1 + 0.4 * np.cos(2 * np.pi * (month - peaks[event]) / 12)
+    growth = 1.05 ** (year - first_year)
+    weekend = np.where(weekday >= 5, 1.2, 1.0)
+    visitors = np.clip(bases[event] * season * growth * weekend * rng.lognormal(0, 0.3, rows), 100, None).astype(np.int64)
+
+    revenue = (visitors * rng.uniform(1000, 2000, rows)).astype(np.int64)
+    employment = np.maximum((visitors * rng.uniform(0.075, 0.12, rows)).astype(np.int64), 1)
+    level = TOURISM_LEVELS[np.searchsorted(LEVEL_THRESHOLDS, visitors, side='right')]
+    quarter = np.char.add('Q', ((month - 1) // 3 + 1).astype(str))
+
+    return pa.table({
+        'Date': pa.array(dates), 'State': states[event], 'Event': names[event], 'Art_Form': art_forms[event],
+        'Visitors': visitors, 'Tourism_Level': level, 'Revenue_INR': revenue, 'Local_Employment': employment,
+        'Month': month, 'Year': year, 'Quarter': quarter, 'Region': regions[event],
+    }).select(COLUMNS)
+
+
+def write_csv(path, rows, events=200, seed=0):
+    """Stream `rows` synthetic events to a CSV in CHUNK_ROWS pieces, so 50M rows never sit in memory"""
+    rng = np.random.default_rng(seed)
+    catalog = event_catalog(events, rng)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    # Unquoted like the sample; no generated value contains a comma
+    options = pa_csv.WriteOptions(quoting_style='none')
+    with pa_csv.CSVWriter(tmp_path, generate_chunk(0, catalog, rng).schema, write_options=options) as writer:
+        for start in range(0, rows, CHUNK_ROWS):
+            writer.write_table(generate_chunk(min(CHUNK_ROWS, rows - start), catalog, rng))
+    os.replace(tmp_path, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic cultural tourism events as CSV")
+    parser.add_argument('--rows', type=int, required=True)
+    parser.add_argument('--events', type=int, default=200, help="Distinct events (the sample has 14)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+    write_csv(args.output, args.rows, args.events, args.seed)
+    print(f"Wrote {args.rows:,} rows to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
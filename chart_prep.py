@@ -0,0 +1,120 @@
+"""
+Shrink Plotly figures for Cultural Tourism Dashboard before they are sent to the browser
+
+Time series above a point budget are downsampled with Largest-Triangle-Three-Buckets,
+which keeps the peaks and troughs a chart's shape depends on; large marker traces
+switch to WebGL.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Points a time-series trace keeps; a chart a few hundred pixels wide cannot show more
+CHART_POINT_BUDGET = int(os.getenv('TOURISM_CHART_POINTS', '2000'))
+
+# Marker traces with more points than this are drawn with WebGL (Scattergl) instead of SVG
+WEBGL_MIN_POINTS = 1000
+
+# Trace properties that may hold one value per point and must be subset with x and y
+PER_POINT_PROPERTIES = ['x', 'y', 'text', 'hovertext', 'customdata', 'marker.size', 'marker.color']
+
+
+def lttb(x, y, threshold):
+    """Indices of `threshold` points chosen by Largest-Triangle-Three-Buckets; x must be sorted.
+
+    The first and last points are kept. Each bucket in between contributes the
+    point forming the largest triangle with the previously chosen point and the
+    mean of the next bucket.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    chosen = np.empty(threshold, dtype=np.int64)
+    chosen[0], chosen[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_start, next_stop = stop, edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_x, next_y = x[next_start:next_stop].mean(), y[next_start:next_stop].mean()
+        # Twice the triangle area, up to sign; the constant factor does not change the argmax
+        area = np.abs((x[previous] - next_x) * (y[start:stop] - y[previous])
+                      - (x[previous] - x[start:stop]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(area))
+        chosen[bucket + 1] = previous
+    return chosen
+
+
+def _numeric_x(values):
+    """x values as floats if they are numbers or dates, else None"""
+    values = np.asarray(values)
+    if values.dtype.kind == 'M':
+        return values.astype('datetime64[ns]').astype(np.int64).astype(float)
+    if values.dtype.kind in 'iuf':
+        return values.astype(float)
+    try:
+        return pd.to_datetime(values).asi8.astype(float)
+    except (TypeError, ValueError):
+        return None
+
+
+def _time_series(trace):
+    """Sorted numeric x for a Scatter trace that plots y against ordered x, else None"""
+    if not isinstance(trace, (go.Scatter, go.Scattergl)) or trace.x is None or trace.y is None or len(trace.x) != len(trace.y):
+        return None
+    x = _numeric_x(trace.x)
+    if x is None or np.isnan(x).any() or (np.diff(x) < 0).any():
+        return None
+    return x
+
+
+def prepare_figure(fig, budget=CHART_POINT_BUDGET):
+    """Downsample time-series traces over `budget` points and move large marker traces to WebGL, in place.
+
+    Traces drawn over the same x (a forecast and its interval bounds) keep the
+    same points, chosen on the first of them, so fills between them line up.
+    Returns (points before, points after).
+    """
+    before = after = 0
+    kept = {}  # x fingerprint -> indices chosen for the first trace over that x
+    traces = []
+    for trace in fig.data:
+        points = len(trace.x) if getattr(trace, 'x', None) is not None else 0
+        before += points
+        x = _time_series(trace) if points > budget else None
+        if x is not None:
+            key = (len(x), x[0], x[-1], float(x.sum()))
+            if key not in kept:
+                kept[key] = lttb(x, np.nan_to_num(np.asarray(trace.y, dtype=float)), budget)
+            indices = kept[key]
+            for path in PER_POINT_PROPERTIES:
+                values = trace[path]
+                if values is not None and not isinstance(values, str) and np.ndim(values) > 0 \
+                        and len(values) == len(x):
+                    trace[path] = np.asarray(values)[indices]
+            points = len(indices)
+        after += points
+        if (isinstance(trace, go.Scatter) and points > WEBGL_MIN_POINTS and trace.mode == 'markers'
+                and trace.fill in (None, 'none')):
+            properties = trace.to_plotly_json()
+            properties.pop('type', None)
+            trace = go.Scattergl(properties, skip_invalid=True)
+        traces.append(trace)
+    if any(isinstance(trace, go.Scattergl) for trace in traces):
+        fig.data = ()
+        fig.add_traces(traces)
+    return before, after
+
+
+def figure_bytes(fig):
+    """Size of the JSON the browser receives for `fig`"""
+    return len(pio.to_json(fig, validate=False).encode())
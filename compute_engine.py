@@ -0,0 +1,133 @@
+"""
+Columnar compute engines for Cultural Tourism Dashboard aggregations
+
+Every aggregation the dashboard runs over in-memory frames reduces to two
+operations: re-summing measures by a set of dimensions (building and slicing
+the cube) and evaluating a declared Aggregate over event rows. The pandas
+engine runs them single-threaded; the DuckDB engine runs the same operations
+as SQL over the frames in place, on every core.
+"""
+
+import os
+import threading
+
+import pandas as pd
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Engine for in-memory aggregations: "pandas" (default) or "duckdb"
+COMPUTE_ENGINE = os.getenv('TOURISM_COMPUTE_ENGINE', 'pandas')
+
+# Frames smaller than this are aggregated with pandas even on DuckDB, whose fixed cost per
+# query (registering the frame, planning, converting the result) would dominate
+DUCKDB_MIN_ROWS = 250_000
+
+DUCKDB_MEASURES = {
+    'sum': 'CAST(SUM({column}) AS BIGINT)',
+    'mean': 'AVG({column})',
+    'count': 'COUNT({column})',
+    'count_where': 'CAST(SUM(CASE WHEN {column} = ? THEN 1 ELSE 0 END) AS BIGINT)',
+}
+
+
+class PandasEngine:
+    """Aggregations with pandas groupby, on one core"""
+    name = 'pandas'
+
+    def group_sum(self, frame, dimensions, measures):
+        """Sum of each measure per observed combination of dimensions (missing values form their own group)"""
+        return frame.groupby(dimensions, observed=True, dropna=False)[measures].sum().reset_index()
+
+    def aggregate(self, aggregate, df):
+        """A DASHBOARD_AGGREGATES entry evaluated over already filtered event rows"""
+        return aggregate.evaluate(df)
+
+
+class DuckDBEngine:
+    """Aggregations as DuckDB SQL over the pandas frames themselves, on all cores"""
+    name = 'duckdb'
+
+    def __init__(self, threads=None, min_rows=DUCKDB_MIN_ROWS):
+        import duckdb
+
+        self.connection = duckdb.connect()
+        if threads:
+            self.connection.execute(f"SET threads = {int(threads)}")
+        # The Snowflake date function Aggregate.to_sql() uses for WEEKDAY
+        self.connection.execute("CREATE MACRO DAYOFWEEKISO(d) AS isodow(d)")
+        self.min_rows = min_rows
+        self.pandas = PandasEngine()
+        self._local = threading.local()
+
+    def _cursor(self):
+        # A connection runs one query at a time; each thread gets its own cursor on the shared database
+        cursor = getattr(self._local, 'cursor', None)
+        if cursor is None:
+            cursor = self._local.cursor = self.connection.cursor()
+        return cursor
+
+    def _query(self, frame, query, params=None):
+        cursor = self._cursor()
+        cursor.register('FRAME', frame)
+        try:
+            return cursor.execute(query, params or None).df()
+        finally:
+            cursor.unregister('FRAME')
+
+    def group_sum(self, frame, dimensions, measures):
+        if len(frame) < self.min_rows:
+            return self.pandas.group_sum(frame, dimensions, measures)
+        keys = ', '.join(f'"{dimension}"' for dimension in dimensions)
+        sums = ', '.join(f'CAST(SUM("{measure}") AS BIGINT) AS "{measure}"' for measure in measures)
+        # Ordered like pandas' sorted groups: by category order, missing values last
+        result = self._query(frame, f"SELECT {keys}, {sums} FROM FRAME GROUP BY {keys} ORDER BY {keys} NULLS LAST")
+        return result.astype({dimension: frame[dimension].dtype for dimension in dimensions
+                              if isinstance(frame[dimension].dtype, pd.CategoricalDtype)})
+
+    def aggregate(self, aggregate, df):
+        if len(df) < self.min_rows:
+            return self.pandas.aggregate(aggregate, df)
+        from snowflake_utils import DATE_DIMENSIONS
+
+        # Like Aggregate.evaluate(), columns already in the frame win over deriving them from the date
+        keys = [f"{DATE_DIMENSIONS[d][0]} AS {d}" if d not in df.columns else f'"{d}"' for d in aggregate.dimensions]
+        measures, params = [], []
+        for name, measure in aggregate.measures.items():
+            measures.append(DUCKDB_MEASURES[measure.func].format(column=f'"{measure.column}"') + f' AS "{name}"')
+            if measure.func == 'count_where':
+                params.append(measure.value)
+        # Built frames call the date column "Date"; the Snowflake expressions expect DATE
+        source = 'SELECT * EXCLUDE ("Date"), "Date" AS DATE FROM FRAME' if 'Date' in df.columns else 'SELECT * FROM FRAME'
+        positions = ', '.join(str(position + 1) for position in range(len(keys)))
+        query = (f"SELECT {', '.join(keys + measures)} FROM ({source}) "
+                 f"GROUP BY {positions} ORDER BY {positions} NULLS LAST")
+        return aggregate.order_and_limit(self._query(df, query, params))
+
+
+ENGINES = {
+    'pandas': PandasEngine,
+    'duckdb': DuckDBEngine,
+}
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def create_engine(name=None):
+    """Create the engine named by `name` or the TOURISM_COMPUTE_ENGINE env var"""
+    name = name or COMPUTE_ENGINE
+    if name not in ENGINES:
+        raise ValueError(f"Unknown compute engine '{name}', expected one of {sorted(ENGINES)}")
+    if name == 'duckdb':
+        return DuckDBEngine(threads=os.getenv('TOURISM_COMPUTE_THREADS') or None)
+    return ENGINES[name]()
+
+
+def get_compute_engine():
+    """The process-wide engine chosen by TOURISM_COMPUTE_ENGINE at startup"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = create_engine()
+        return _engine
@@ -0,0 +1,107 @@
+"""
+Pre-aggregated rollup cube serving the Cultural Tourism Dashboard cards and charts
+"""
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from compute_engine import get_compute_engine
+from filter_index import FilterIndex
+
+CUBE_DIMENSIONS = ['YEAR', 'MONTH', 'DAY', 'WEEKDAY', 'STATE', 'EVENT', 'ART_FORM', 'REGION', 'TOURISM_LEVEL']
+# Additive measures; EVENTS is the row count, so means are re-derived as sum / EVENTS
+CUBE_MEASURES = ['VISITORS', 'REVENUE_INR', 'LOCAL_EMPLOYMENT', 'EVENTS']
+CUBE_TEXT_DIMENSIONS = ['STATE', 'EVENT', 'ART_FORM', 'REGION', 'TOURISM_LEVEL']
+
+# Partial cells buffered before they are merged into the running total while streaming
+MIN_COMPACT_CELLS = 500_000
+
+
+def partial_cells(df, engine=None):
+    """Cube cells for a frame of built event rows (see build_frame); cells of several frames merge with merge_cells()"""
+    frame = df[['YEAR', 'MONTH', 'STATE', 'EVENT', 'ART_FORM', 'REGION', 'TOURISM_LEVEL',
+                'VISITORS', 'REVENUE_INR', 'LOCAL_EMPLOYMENT']].copy()
+    frame['DAY'] = df['Date'].dt.day.astype('int8')
+    frame['WEEKDAY'] = (df['Date'].dt.dayofweek + 1).astype('int8')  # 1 = Monday
+    frame['EVENTS'] = 1
+    return (engine or get_compute_engine()).group_sum(frame, CUBE_DIMENSIONS, CUBE_MEASURES)
+
+
+def merge_cells(parts, engine=None):
+    """Combine partial cells into one set: every measure is a sum, so matching cells just add up"""
+    # Batches carry their own categories; align them first so concat keeps the columns categorical
+    for column in CUBE_TEXT_DIMENSIONS:
+        categories = union_categoricals([part[column] for part in parts]).categories
+        parts = [part.assign(**{column: part[column].cat.set_categories(categories)}) for part in parts]
+    cells = pd.concat(parts, ignore_index=True)
+    return (engine or get_compute_engine()).group_sum(cells, CUBE_DIMENSIONS, CUBE_MEASURES)
+
+
+class Cube:
+    """Event rows rolled up over every dimension the dashboard filters or groups by.
+
+    Built once per data refresh; each rerun slices the cells with a FilterIndex
+    and re-sums them instead of grouping the raw event table. Every re-sum runs
+    on the compute engine (see compute_engine.py).
+    """
+
+    def __init__(self, df=None, cells=None, engine=None):
+        self.engine = engine or get_compute_engine()
+        self.cells = partial_cells(df, self.engine) if cells is None else cells
+        self.index = FilterIndex(self.cells, CUBE_DIMENSIONS)
+
+    @classmethod
+    def from_frames(cls, frames, engine=None):
+        """Fold a stream of built event frames into one cube; only the current frame is held as event rows.
+
+        Partial cells are buffered and merged once they outnumber the merged
+        cells, so each cell is re-summed a logarithmic number of times.
+        Returns None when there are no frames.
+        """
+        engine = engine or get_compute_engine()
+        merged, pending, pending_cells = None, [], 0
+        for frame in frames:
+            part = partial_cells(frame, engine)
+            pending.append(part)
+            pending_cells += len(part)
+            if pending_cells >= max(MIN_COMPACT_CELLS, 0 if merged is None else len(merged)):
+                merged = merge_cells(([] if merged is None else [merged]) + pending, engine)
+                pending, pending_cells = [], 0
+        if pending:
+            merged = merge_cells(([] if merged is None else [merged]) + pending, engine)
+        return None if merged is None else cls(cells=merged, engine=engine)
+
+    def slice(self, **selections):
+        """Cells matching the sidebar selections, e.g. slice(STATE='Odisha', YEAR=2020)"""
+        return self.index.filter(**selections)
+
+    def daily(self, cells):
+        """Total visitors per date as the ds/y frame Prophet expects, like forecasting.daily_series() on event rows"""
+        daily = cells.groupby(['YEAR', 'MONTH', 'DAY'], observed=True)['VISITORS'].sum().reset_index()
+        ds = pd.to_datetime(daily[['YEAR', 'MONTH', 'DAY']].astype('int64').set_axis(['year', 'month', 'day'], axis=1))
+        return pd.DataFrame({'ds': ds.astype('datetime64[us]'), 'y': daily['VISITORS'].astype('int64')})
+
+    def evaluate(self, aggregate, cells):
+        """Answer a DASHBOARD_AGGREGATES entry from cube cells instead of event rows"""
+        columns = {dimension: cells[dimension] for dimension in aggregate.dimensions}
+        columns['EVENTS'] = cells['EVENTS']
+        for name, measure in aggregate.measures.items():
+            if measure.func in ('sum', 'mean'):
+                columns[measure.column] = cells[measure.column]
+            elif measure.func == 'count_where':
+                columns[name] = cells['EVENTS'].where(cells[measure.column] == measure.value, 0)
+        measures = [column for column in columns if column not in aggregate.dimensions]
+        grouped = self.engine.group_sum(pd.DataFrame(columns), aggregate.dimensions, measures).set_index(aggregate.dimensions)
+
+        result = pd.DataFrame(index=grouped.index)
+        for name, measure in aggregate.measures.items():
+            if measure.func == 'sum':
+                result[name] = grouped[measure.column]
+            elif measure.func == 'mean':
+                result[name] = grouped[measure.column] / grouped['EVENTS']
+            elif measure.func == 'count':
+                result[name] = grouped['EVENTS']
+            else:
+                result[name] = grouped[name]
+        return aggregate.order_and_limit(result.reset_index())
+
@@ -0,0 +1,206 @@
+"""
+On-disk Parquet mirror of CULTURAL_TOURISM_EVENTS for Cultural Tourism Dashboard
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import streamlit as st
+
+MANIFEST_NAME = 'manifest.json'
+
+# Columns summed when comparing the mirror with the warehouse
+CHECKSUM_COLUMNS = ['VISITORS', 'REVENUE_INR', 'LOCAL_EMPLOYMENT']
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TableMirror:
+    """Parquet copy of the events table, kept current by fetching rows at or after the DATE watermark.
+
+    The mirror is a base file plus delta parts listed in a manifest. Each delta
+    holds every row from its `since` date onwards, so it replaces whatever older
+    parts held for those dates (late-arriving rows for the watermark day are
+    picked up). Deltas are compacted into the base once there are too many.
+    """
+
+    def __init__(self, directory, max_age=900, max_parts=8):
+        self.directory = directory
+        self.max_age = max_age
+        self.max_parts = max_parts
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    # Manifest
+
+    def _manifest_path(self):
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    def read_manifest(self):
+        try:
+            with open(self._manifest_path()) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_manifest(self, manifest):
+        tmp_path = self._manifest_path() + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self._manifest_path())
+
+    def _write_part(self, table, name):
+        path = os.path.join(self.directory, name)
+        pq.write_table(table, path + '.tmp', compression='zstd')
+        os.replace(path + '.tmp', path)
+        return {'file': name, 'rows': table.num_rows, 'sha256': file_sha256(path)}
+
+    # Reading
+
+    def load_table(self, manifest=None):
+        """Read the mirror as one Arrow table ordered by DATE descending, or None if it is empty"""
+        manifest = manifest or self.read_manifest()
+        if not manifest:
+            return None
+        table = None
+        for part in manifest['parts']:
+            part_table = pq.read_table(os.path.join(self.directory, part['file']), memory_map=True)
+            if table is None:
+                table = part_table
+                continue
+            # Rows on or after this part's `since` date are superseded by the part
+            since = pa.scalar(part['since']).cast(table['DATE'].type)
+            table = pa.concat_tables([table.filter(pc.less(table['DATE'], since)), part_table],
+                                     promote_options='permissive')
+        return table.sort_by([('DATE', 'descending')])
+
+    def verify(self, manifest):
+        """True if every part on disk still matches the checksum recorded when it was written"""
+        for part in manifest['parts']:
+            path = os.path.join(self.directory, part['file'])
+            if not os.path.exists(path) or file_sha256(path) != part['sha256']:
+                return False
+        return True
+
+    # Refreshing
+
+    def _warehouse_checksum(self, sf, before):
+        sums = ", ".join(f"SUM({column}) AS {column}" for column in CHECKSUM_COLUMNS)
+        result = sf.execute_query(
+            f"SELECT COUNT(*) AS ROW_COUNT, {sums} FROM CULTURAL_TOURISM_EVENTS WHERE DATE < ?", [before])
+        if result is None:
+            return None
+        row = result.iloc[0]
+        return [int(row['ROW_COUNT'])] + [int(row[column] or 0) for column in CHECKSUM_COLUMNS]
+
+    def _local_checksum(self, table, before):
+        older = table.filter(pc.less(table['DATE'], pa.scalar(before).cast(table['DATE'].type)))
+        return [older.num_rows] + [int(pc.sum(older[column]).as_py() or 0) for column in CHECKSUM_COLUMNS]
+
+    def rebuild(self, sf):
+        """Replace the mirror with a full copy of the warehouse table"""
+        table = sf.fetch_arrow(sf.cultural_data_query()[0])
+        if table is None:
+            return None
+        manifest = {'parts': [], 'watermark': None, 'refreshed_at': time.time()}
+        part = self._write_part(table, f"base-{int(time.time() * 1000)}.parquet")
+        part['since'] = None
+        manifest['parts'] = [part]
+        manifest['watermark'] = self._watermark(table)
+        self._replace_manifest(manifest)
+        return table
+
+    def refresh(self, sf):
+        """Fetch rows at or after the watermark, rebuilding instead if the mirror has drifted"""
+        with self._lock:
+            manifest = self.read_manifest()
+            if not manifest or not manifest['watermark'] or not self.verify(manifest):
+                return self.rebuild(sf)
+
+            table = self.load_table(manifest)
+            watermark = manifest['watermark']
+            if self._warehouse_checksum(sf, watermark) != self._local_checksum(table, watermark):
+                print(f"Mirror drifted from warehouse before {watermark}, rebuilding")
+                return self.rebuild(sf)
+
+            query, params = sf.cultural_data_query({'date_from': watermark})
+            delta = sf.fetch_arrow(query, params)
+            if delta is None:
+                return None
+            part = self._write_part(delta, f"delta-{int(time.time() * 1000)}.parquet")
+            part['since'] = watermark
+            manifest['parts'].append(part)
+            manifest['watermark'] = self._watermark(delta) or watermark
+            manifest['refreshed_at'] = time.time()
+            self._replace_manifest(manifest)
+            if len(manifest['parts']) > self.max_parts:
+                return self.compact()
+            return self.load_table(manifest)
+
+    def compact(self):
+        """Merge the base and all deltas into a single base file"""
+        manifest = self.read_manifest()
+        table = self.load_table(manifest)
+        if table is None:
+            return None
+        part = self._write_part(table, f"base-{int(time.time() * 1000)}.parquet")
+        part['since'] = None
+        manifest['parts'] = [part]
+        self._replace_manifest(manifest)
+        return table
+
+    def load(self, sf):
+        """Serve the mirror from disk, refreshing it first when it is older than max_age seconds"""
+        manifest = self.read_manifest()
+        if manifest and time.time() - manifest['refreshed_at'] < self.max_age:
+            return self.load_table(manifest)
+        try:
+            table = self.refresh(sf)
+        except Exception as e:
+            print(f"Mirror refresh failed: {e}")
+            table = None
+        if table is None and manifest:
+            # Stale data is better than none while the warehouse is unreachable
+            return self.load_table(manifest)
+        return table
+
+    def _watermark(self, table):
+        if table.num_rows == 0:
+            return None
+        return str(pc.max(table['DATE']).as_py())
+
+    def _replace_manifest(self, manifest):
+        """Write the manifest, then delete part files it no longer references"""
+        self._write_manifest(manifest)
+        keep = {part['file'] for part in manifest['parts']} | {MANIFEST_NAME}
+        for name in os.listdir(self.directory):
+            if name not in keep and name.endswith('.parquet'):
+                os.remove(os.path.join(self.directory, name))
+
+
+def check_mirror_backend():
+    """Raise ValueError for the offline backend: it answers no SQL, and its data is already on disk"""
+    if os.getenv('TOURISM_BACKEND') == 'offline':
+        raise ValueError("TOURISM_MIRROR_DIR cannot be used with TOURISM_BACKEND=offline; unset it")
+
+
+@st.cache_resource
+def get_table_mirror():
+    """Process-wide mirror configured by TOURISM_MIRROR_DIR, or None when mirroring is disabled"""
+    directory = os.getenv('TOURISM_MIRROR_DIR')
+    if not directory:
+        return None
+    check_mirror_backend()
+    return TableMirror(directory, max_age=int(os.getenv('TOURISM_MIRROR_MAX_AGE', 900)))
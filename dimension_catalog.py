@@ -0,0 +1,66 @@
+"""
+Filter options for Cultural Tourism Dashboard, fetched without loading the events table
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from dotenv import load_dotenv
+
+from snowflake_utils import open_connection
+from tracing import span
+
+load_dotenv()
+
+CATALOG_COLUMNS = ['STATE', 'EVENT', 'YEAR']
+
+# Seconds the catalog is served before it is fetched again; loading new data also refreshes it
+CATALOG_TTL = int(os.getenv('TOURISM_CATALOG_TTL', 900))
+
+
+class DimensionCatalog:
+    """The (STATE, EVENT, YEAR) combinations that occur in the data.
+
+    Options for one column can be narrowed by selections in the others, e.g.
+    only the events held in the selected state.
+    """
+
+    def __init__(self, combinations):
+        # Rows with a NULL DATE have no year; nullable Int64 keeps them under YEAR='All'
+        combinations = combinations[CATALOG_COLUMNS]
+        combinations = combinations.assign(YEAR=pd.to_numeric(combinations['YEAR']).astype('Int64'))
+        self.combinations = combinations.drop_duplicates().reset_index(drop=True)
+        self._values = {column: sorted(self.combinations[column].dropna().unique().tolist())
+                        for column in CATALOG_COLUMNS}
+
+    @classmethod
+    def from_frame(cls, df):
+        """Catalog of an already loaded events frame"""
+        return cls(df[CATALOG_COLUMNS].drop_duplicates())
+
+    def values(self, column, **selections):
+        """Sorted distinct values of `column` among combinations matching the selections (None/'All' ignored)"""
+        selections = {other: value for other, value in selections.items()
+                      if other != column and value is not None and value != 'All'}
+        if not selections:
+            return list(self._values[column])
+        mask = np.ones(len(self.combinations), dtype=bool)
+        for other, value in selections.items():
+            mask &= (self.combinations[other] == value).fillna(False).to_numpy(dtype=bool)
+        return sorted(self.combinations.loc[mask, column].dropna().unique().tolist())
+
+
+@st.cache_resource(ttl=CATALOG_TTL)
+def get_dimension_catalog():
+    """Catalog shared by every session, from a single grouped query"""
+    with span('dimension_catalog') as catalog_span:
+        combinations = open_connection().get_filter_combinations()
+        if combinations is None:
+            # Raising keeps the failure out of the cache, so the next rerun tries again
+            raise RuntimeError("Filter options could not be fetched")
+        if catalog_span:
+            catalog_span.set(combinations=len(combinations), rows=int(combinations['ROW_COUNT'].sum()))
+    return DimensionCatalog(combinations)
+
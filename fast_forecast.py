@@ -0,0 +1,103 @@
+"""
+Vectorized NumPy forecasting engine for Cultural Tourism Dashboard: linear trend plus Fourier seasonality
+"""
+
+import numpy as np
+import pandas as pd
+
+from forecasting import CUSTOM_SEASONALITIES
+
+# (name, period in days, Fourier order); yearly and weekly use Prophet's default orders
+FOURIER_TERMS = [('yearly', 365.25, 10), ('weekly', 7.0, 3)] + [
+    (seasonality['name'], seasonality['period'], seasonality['fourier_order']) for seasonality in CUSTOM_SEASONALITIES
+]
+
+# Ridge penalty on the seasonal coefficients (trend and intercept are not penalized). Sparse
+# series have fewer points than terms, so this is what keeps their fit well-posed.
+SEASONALITY_PENALTY = 10.0
+
+# Matches Prophet's default interval_width of 0.8
+INTERVAL_Z = 1.2816
+
+
+def _days(ds):
+    return (pd.to_datetime(ds).to_numpy() - np.datetime64('1970-01-01')) / np.timedelta64(1, 'D')
+
+
+def design_matrix(days, start, span, terms=FOURIER_TERMS):
+    """Intercept, scaled trend and sin/cos columns for `days` (any leading batch shape)"""
+    columns = [np.ones_like(days), (days - start) / span]
+    for _, period, order in terms:
+        angles = 2 * np.pi * days[..., None] * np.arange(1, order + 1) / period
+        columns.extend([np.sin(angles), np.cos(angles)])
+    return np.concatenate([column if column.ndim > days.ndim else column[..., None] for column in columns], axis=-1)
+
+
+class FourierModel:
+    """A fitted series; exposes Prophet's make_future_dataframe()/predict() so forecasting.predict() works on it"""
+
+    def __init__(self, history_ds, coefficients, start, span, scale, sigma, terms=FOURIER_TERMS):
+        self.history_ds = pd.Series(pd.to_datetime(history_ds)).reset_index(drop=True)
+        self.coefficients = coefficients
+        self.start = start
+        self.span = span
+        self.scale = scale
+        self.sigma = sigma
+        self.terms = terms
+
+    def make_future_dataframe(self, periods):
+        future = pd.date_range(self.history_ds.iloc[-1], periods=periods + 1, freq='D')[1:]
+        return pd.DataFrame({'ds': pd.concat([self.history_ds, pd.Series(future)], ignore_index=True)})
+
+    def predict(self, future):
+        matrix = design_matrix(_days(future['ds']), self.start, self.span, self.terms)
+        yhat = matrix @ self.coefficients * self.scale
+        width = INTERVAL_Z * self.sigma * self.scale
+        return pd.DataFrame({'ds': future['ds'].to_numpy(), 'yhat': yhat,
+                             'yhat_lower': yhat - width, 'yhat_upper': yhat + width})
+
+
+def fit_many(histories, terms=FOURIER_TERMS, penalty=SEASONALITY_PENALTY):
+    """Fit every ds/y frame in one batched least-squares solve, returning a FourierModel per series.
+
+    Series are padded to a common length and padding rows get zero weight, so
+    all normal equations are built with one einsum and solved with one call.
+    """
+    histories = [history.sort_values('ds') for history in histories]
+    lengths = np.array([len(history) for history in histories])
+    if len(histories) == 0:
+        return []
+    mask = np.arange(lengths.max()) < lengths[:, None]
+
+    days = np.zeros(mask.shape)
+    values = np.zeros(mask.shape)
+    for i, history in enumerate(histories):
+        days[i, :lengths[i]] = _days(history['ds'])
+        values[i, :lengths[i]] = history['y'].to_numpy(dtype=float)
+
+    # Per-series time and value scaling, as Prophet does, so one penalty suits every series
+    start = days[:, 0]
+    span = np.maximum(np.where(mask, days, -np.inf).max(axis=1) - start, 1.0)
+    scale = np.maximum(np.abs(np.where(mask, values, 0)).max(axis=1), 1.0)
+    matrix = design_matrix(days, start[:, None], span[:, None], terms) * mask[..., None]
+    target = values / scale[:, None] * mask
+
+    penalties = np.full(matrix.shape[-1], penalty)
+    penalties[:2] = 0.0
+    cross = np.einsum('snp,snq->spq', matrix, matrix)
+    gram = cross + np.diag(penalties)
+    coefficients = np.linalg.solve(gram, np.einsum('snp,sn->sp', matrix, target)[..., None])[..., 0]
+
+    # Residual spread over the effective residual degrees of freedom (n minus the trace
+    # of the ridge hat matrix), so sparse series do not get overconfident intervals
+    residuals = (target - np.einsum('snp,sp->sn', matrix, coefficients)) * mask
+    fitted_dof = np.trace(np.linalg.solve(gram, cross), axis1=1, axis2=2)
+    sigma = np.sqrt((residuals ** 2).sum(axis=1) / np.maximum(lengths - fitted_dof, 1.0))
+
+    return [FourierModel(history['ds'], coefficients[i], start[i], span[i], scale[i], sigma[i], terms)
+            for i, history in enumerate(histories)]
+
+
+def fit_fourier(history, terms=FOURIER_TERMS, penalty=SEASONALITY_PENALTY):
+    """Fit a single ds/y frame"""
+    return fit_many([history], terms, penalty)[0]
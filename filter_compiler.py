@@ -0,0 +1,74 @@
+"""
+Compile dashboard filters into canonical, parameterised SQL for Cultural Tourism Dashboard
+"""
+
+# Filter key -> SQL expression it constrains. Predicates are emitted in key order
+# so the same filter combination always produces the same statement text.
+FILTER_COLUMNS = {
+    'art_form': 'ART_FORM',
+    'date_from': 'DATE',
+    'event': 'EVENT',
+    'month': 'MONTH(DATE)',
+    'quarter': 'QUARTER(DATE)',
+    'region': 'REGION',
+    'state': 'STATE',
+    'tourism_level': 'TOURISM_LEVEL',
+    'year': 'YEAR(DATE)',
+}
+
+INTEGER_FILTERS = {'month', 'quarter', 'year'}
+
+# Filters that are inclusive lower bounds rather than equality/IN matches
+LOWER_BOUND_FILTERS = {'date_from'}
+
+# Columns get_unique_values() may be asked about; identifiers cannot be bound
+DIMENSION_COLUMNS = {'ART_FORM', 'EVENT', 'REGION', 'STATE', 'TOURISM_LEVEL', 'DATE', 'VISITORS',
+                     'REVENUE_INR', 'LOCAL_EMPLOYMENT'}
+
+
+def _coerce(key, value):
+    """Bind values must be plain Python types; numpy ints and 'Q1' style quarters are converted"""
+    if key in INTEGER_FILTERS:
+        return int(str(value).lstrip('Qq'))
+    return str(value)
+
+
+def normalize_filters(filters):
+    """Drop unset/'All' filters and turn every value into a sorted tuple of distinct values"""
+    normalized = {}
+    for key, value in (filters or {}).items():
+        if key not in FILTER_COLUMNS:
+            raise ValueError(f"Unknown filter '{key}', expected one of {sorted(FILTER_COLUMNS)}")
+        values = value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+        values = [v for v in values if v is not None and v != '' and v != 'All']
+        if values:
+            normalized[key] = tuple(sorted({_coerce(key, v) for v in values}))
+    return normalized
+
+
+def compile_filters(filters):
+    """Return (where_clause, params) using ? placeholders; where_clause is '' when nothing is filtered"""
+    predicates = []
+    params = []
+    for key, values in sorted(normalize_filters(filters).items()):
+        column = FILTER_COLUMNS[key]
+        if key in LOWER_BOUND_FILTERS:
+            predicates.append(f"{column} >= ?")
+            values = values[:1]
+        elif len(values) == 1:
+            predicates.append(f"{column} = ?")
+        else:
+            predicates.append(f"{column} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+
+    if not predicates:
+        return "", []
+    return " WHERE " + " AND ".join(predicates), params
+
+
+def check_column(column_name):
+    """Validate a column name before it is interpolated into SQL"""
+    column_name = column_name.upper()
+    if column_name not in DIMENSION_COLUMNS:
+        raise ValueError(f"Unknown column '{column_name}'")
+    return column_name
@@ -0,0 +1,79 @@
+"""
+Precomputed row index answering the dashboard's filter selections for Cultural Tourism Dashboard
+"""
+
+import numpy as np
+import pandas as pd
+
+INDEX_COLUMNS = ['STATE', 'EVENT', 'YEAR', 'MONTH', 'QUARTER', 'REGION', 'ART_FORM', 'TOURISM_LEVEL']
+
+
+class FilterIndex:
+    """Per-column value codes and per-value row positions, built once per dataset.
+
+    A selection starts from the row positions of its most selective column and
+    checks the remaining columns' codes at just those rows, so the cost grows
+    with the number of selected rows rather than the size of the table.
+    """
+
+    def __init__(self, df, columns=INDEX_COLUMNS):
+        self.df = df
+        self._codes = {}
+        self._values = {}
+        self._order = {}
+        self._starts = {}
+        for column in columns:
+            if column not in df.columns:
+                continue
+            codes, values = pd.factorize(df[column], sort=True)
+            counts = np.bincount(codes[codes >= 0], minlength=len(values))
+            self._codes[column] = codes
+            self._values[column] = pd.Index(np.asarray(values))
+            # Rows grouped by code; the rows for code k are order[starts[k]:starts[k + 1]]
+            self._order[column] = np.argsort(codes, kind='stable')[(codes < 0).sum():]
+            self._starts[column] = np.concatenate([[0], np.cumsum(counts)])
+
+    def values(self, column):
+        """Sorted distinct values of an indexed column"""
+        return self._values[column].tolist()
+
+    def _rows_for(self, column, codes):
+        starts, order = self._starts[column], self._order[column]
+        if len(codes) == 1:
+            return order[starts[codes[0]]:starts[codes[0] + 1]]
+        return np.sort(np.concatenate([order[starts[code]:starts[code + 1]] for code in codes]))
+
+    def positions(self, **selections):
+        """Row positions matching every selection (a value or a list of values; None/'All' ignored).
+
+        Returns None when nothing is selected.
+        """
+        criteria = []
+        for column, selected in selections.items():
+            selected = selected if isinstance(selected, (list, tuple, set)) else [selected]
+            selected = [value for value in selected if value is not None and value != 'All']
+            if not selected:
+                continue
+            codes = self._values[column].get_indexer(selected)
+            codes = np.unique(codes[codes >= 0])
+            if len(codes) == 0:
+                return np.empty(0, dtype=np.intp)
+            starts = self._starts[column]
+            criteria.append((int((starts[codes + 1] - starts[codes]).sum()), column, codes))
+        if not criteria:
+            return None
+
+        criteria.sort(key=lambda criterion: criterion[0])
+        _, column, codes = criteria[0]
+        rows = self._rows_for(column, codes)
+        for _, column, codes in criteria[1:]:
+            rows = rows[np.isin(self._codes[column][rows], codes)]
+        return rows
+
+    def filter(self, **selections):
+        """Matching rows in their original order; the full frame itself (no copy) when nothing is selected"""
+        rows = self.positions(**selections)
+        if rows is None:
+            return self.df
+        return self.df.take(rows)
+
@@ -0,0 +1,208 @@
+"""
+Batch forecasting job: fit every STATE x EVENT series for the Cultural Tourism Dashboard
+
+Usage:
+    python forecast_batch.py --periods 365 --workers 8 --timeout 300
+    python forecast_batch.py --engine fast
+"""
+
+import argparse
+import collections
+import logging
+import multiprocessing
+import os
+import queue
+import time
+
+import pandas as pd
+
+from filter_index import FilterIndex
+from fast_forecast import fit_many
+from forecasting import (FORECAST_DIR, FORECAST_ENGINES, MIN_HISTORY_POINTS, MODEL_CACHE_DIR, ForecastStore,
+                         ModelCache, daily_series, data_fingerprint, predict)
+from frame_builder import build_frame
+from snowflake_utils import open_connection
+
+
+def load_dataset():
+    """The same frame load_data() builds for the dashboard, without Streamlit caching"""
+    sf = open_connection()
+    mirror_dir = os.getenv('TOURISM_MIRROR_DIR')
+    if mirror_dir:
+        from data_mirror import TableMirror, check_mirror_backend
+        check_mirror_backend()
+        table = TableMirror(mirror_dir).load(sf)
+        df = table.to_pandas() if table is not None else None
+    else:
+        df = sf.load_cultural_data()
+    if df is None or df.empty:
+        raise RuntimeError("No data retrieved for batch forecasting")
+    return build_frame(df)
+
+
+def enumerate_series(df):
+    """Every (state, event) history the forecast tab can ask for, including the 'All' rollups"""
+    index = FilterIndex(df, ['STATE', 'EVENT'])
+    pairs = df.groupby(['STATE', 'EVENT'], observed=True).size().index.tolist()
+    selections = [('All', 'All')]
+    selections += [(state, 'All') for state in index.values('STATE')]
+    selections += [('All', event) for event in index.values('EVENT')]
+    selections += [(str(state), str(event)) for state, event in pairs]
+    for state, event in selections:
+        history = daily_series(index.filter(STATE=state, EVENT=event))
+        if len(history) > MIN_HISTORY_POINTS:
+            yield state, event, history
+
+
+def _fit_series(series_id, state, event, history, periods, results):
+    """Worker process body: fit one series and send back only its future rows.
+
+    Models go through the on-disk model cache, so a series that only gained new
+    days since the last run is warm-started from yesterday's model.
+    """
+    # Per-chain progress logs from every worker would drown the job's own output
+    logging.getLogger('cmdstanpy').disabled = True
+    try:
+        cache = ModelCache(os.getenv('TOURISM_MODEL_CACHE_DIR') or MODEL_CACHE_DIR, max_memory=1)
+        model, mode = cache.update(history, state, event)
+        forecast = predict(model, periods)
+        future = forecast[forecast['ds'] > history['ds'].max()]
+        results.put((series_id, 'ok', future[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].reset_index(drop=True), mode))
+    except Exception as e:
+        results.put((series_id, 'error', repr(e), None))
+
+
+def run_batch(series, periods=365, workers=None, timeout=300):
+    """Fit all series in child processes, at most `workers` at once.
+
+    Each series gets its own process so a hung or crashed fit can be killed
+    after `timeout` seconds without affecting the others.
+    """
+    workers = workers or os.cpu_count() or 1
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+    results = context.Queue()
+    pending = list(enumerate(series))
+    running = {}  # series_id -> (process, started)
+    outcomes = {}
+    forecasts = []
+    finishing = []  # workers whose result is in, joined at the end so a slow exit holds nothing up
+
+    def collect(timeout=None):
+        """Settle every result waiting on the queue, waiting up to `timeout` for the first one"""
+        while True:
+            try:
+                series_id, status, payload, mode = results.get(timeout=timeout) if timeout else results.get_nowait()
+            except queue.Empty:
+                return
+            timeout = None
+            process, started = running.pop(series_id, (None, None))
+            if process is None:
+                # Already settled as timed out or failed; its late result is dropped
+                continue
+            finishing.append(process)
+            outcomes[series_id] = (status, time.monotonic() - started, None if status == 'ok' else payload, mode)
+            if status == 'ok':
+                forecasts.append((series_id, payload))
+
+    while pending or running:
+        while pending and len(running) < workers:
+            series_id, (state, event, history) = pending.pop(0)
+            process = context.Process(target=_fit_series, args=(series_id, state, event, history, periods, results), daemon=True)
+            process.start()
+            running[series_id] = (process, time.monotonic())
+
+        collect(timeout=0.5)
+
+        now = time.monotonic()
+        for series_id, (process, started) in list(running.items()):
+            timed_out = now - started > timeout
+            crashed = not process.is_alive() and process.exitcode not in (0, None)
+            if not (timed_out or crashed):
+                continue
+            # A result already on the queue wins, and is taken before terminate() can cut a put short
+            collect()
+            if series_id not in running:
+                continue
+            running.pop(series_id)
+            if timed_out:
+                process.terminate()
+                process.join()
+                outcomes[series_id] = ('timeout', now - started, f"No result after {timeout}s", None)
+            else:
+                outcomes[series_id] = ('failed', now - started, f"Worker exited with code {process.exitcode}", None)
+
+    for process in finishing:
+        process.join()
+    return forecasts, outcomes
+
+
+def run_fast_batch(series, periods=365):
+    """Fit all series with the fast engine in one vectorized call, in this process"""
+    started = time.monotonic()
+    try:
+        models = fit_many([history for _, _, history in series])
+    except Exception as e:
+        seconds = time.monotonic() - started
+        return [], {series_id: ('error', seconds, repr(e), None) for series_id in range(len(series))}
+
+    forecasts = []
+    for series_id, (model, (_, _, history)) in enumerate(zip(models, series)):
+        forecast = predict(model, periods)
+        future = forecast[forecast['ds'] > history['ds'].max()]
+        forecasts.append((series_id, future[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].reset_index(drop=True)))
+    # One solve covers every series, so each is charged an equal share of it
+    seconds = (time.monotonic() - started) / max(len(series), 1)
+    return forecasts, {series_id: ('ok', seconds, None, 'full') for series_id in range(len(series))}
+
+
+def build_results(series, forecasts, outcomes, periods, engine='prophet'):
+    """Compact forecast table (categorical keys, float32 values) and the per-series run report"""
+    frames = []
+    for series_id, future in forecasts:
+        state, event, _ = series[series_id]
+        frames.append(future.assign(STATE=state, EVENT=event))
+    if frames:
+        table = pd.concat(frames, ignore_index=True)
+    else:
+        table = pd.DataFrame(columns=['ds', 'yhat', 'yhat_lower', 'yhat_upper', 'STATE', 'EVENT'])
+    table = table.astype({'STATE': 'category', 'EVENT': 'category', 'yhat': 'float32',
+                          'yhat_lower': 'float32', 'yhat_upper': 'float32'})
+
+    report = {'generated_at': time.time(), 'periods': periods, 'engine': engine, 'series': []}
+    for series_id, (state, event, history) in enumerate(series):
+        status, seconds, error, mode = outcomes.get(series_id, ('failed', 0.0, 'No result', None))
+        report['series'].append({'state': state, 'event': event, 'status': status, 'seconds': round(seconds, 2),
+                                 'mode': mode, 'fingerprint': data_fingerprint(history), 'error': error})
+    return table[['STATE', 'EVENT', 'ds', 'yhat', 'yhat_lower', 'yhat_upper']], report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit forecasts for every STATE x EVENT series")
+    parser.add_argument('--periods', type=int, default=365, help="Days to forecast (the dashboard allows up to 365)")
+    parser.add_argument('--workers', type=int, default=None, help="Parallel fits (default: CPU count)")
+    parser.add_argument('--timeout', type=float, default=300, help="Seconds before a single fit is abandoned")
+    parser.add_argument('--engine', choices=FORECAST_ENGINES, default='prophet',
+                        help="Forecasting engine; 'fast' fits every series in one call and ignores --workers/--timeout")
+    parser.add_argument('--output', default=os.getenv('TOURISM_FORECAST_DIR') or FORECAST_DIR)
+    args = parser.parse_args()
+
+    series = list(enumerate_series(load_dataset()))
+    if args.engine == 'fast':
+        print(f"Forecasting {len(series)} series with the fast engine")
+        forecasts, outcomes = run_fast_batch(series, args.periods)
+    else:
+        print(f"Forecasting {len(series)} series with {args.workers or os.cpu_count()} workers")
+        forecasts, outcomes = run_batch(series, args.periods, args.workers, args.timeout)
+    table, report = build_results(series, forecasts, outcomes, args.periods, args.engine)
+    ForecastStore(args.output).write(table, report)
+
+    failed = [entry for entry in report['series'] if entry['status'] != 'ok']
+    print(f"Wrote {len(series) - len(failed)} forecasts to {args.output}, {len(failed)} failed")
+    modes = collections.Counter(entry['mode'] for entry in report['series'] if entry['status'] == 'ok')
+    print("Models: " + ", ".join(f"{count} {mode}" for mode, count in sorted(modes.items())))
+    for entry in failed:
+        print(f"  {entry['state']} / {entry['event']}: {entry['status']} ({entry['error']})")
+
+
+if __name__ == '__main__':
+    main()
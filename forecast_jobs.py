@@ -0,0 +1,64 @@
+"""
+Background forecast jobs shared by all Cultural Tourism Dashboard sessions
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+
+class ForecastJobs:
+    """Runs forecast fits on a thread pool so the script thread never waits on Prophet.
+
+    Jobs are keyed by what they compute, so sessions asking for the same
+    forecast share one job. A job nobody is watching any more is cancelled if
+    it has not started; a fit that is already running is left to finish, since
+    its model lands in the model cache either way.
+    """
+
+    def __init__(self, max_workers=2, max_finished=64):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='forecast')
+        self.max_finished = max_finished
+        self._jobs = OrderedDict()  # key -> Future, oldest first
+        self._watchers = {}  # key -> session ids waiting on the job
+        self._lock = threading.Lock()
+
+    def submit(self, key, session_id, fn, *args):
+        """Future for `key`, starting fn(*args) only if no live job computes it already"""
+        with self._lock:
+            future = self._jobs.get(key)
+            if future is None or future.cancelled():
+                future = self._executor.submit(fn, *args)
+                self._jobs[key] = future
+            self._watchers.setdefault(key, set()).add(session_id)
+            self._prune()
+            return future
+
+    def release(self, key, session_id):
+        """Stop watching a job; the last watcher leaving cancels it if it is still queued"""
+        with self._lock:
+            watchers = self._watchers.get(key, set())
+            watchers.discard(session_id)
+            if watchers:
+                return
+            self._watchers.pop(key, None)
+            future = self._jobs.get(key)
+            if future is not None and (future.cancel() or future.done()):
+                del self._jobs[key]
+
+    def _prune(self):
+        # Caller holds the lock. Finished jobs are kept so watchers can read their
+        # result, but sessions that ended never release, so cap how many are kept.
+        finished = [key for key, future in self._jobs.items() if future.done()]
+        for key in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[key]
+            self._watchers.pop(key, None)
+
+
+@st.cache_resource
+def get_forecast_jobs():
+    """Process-wide job runner; TOURISM_FORECAST_WORKERS fits run at once"""
+    return ForecastJobs(max_workers=int(os.getenv('TOURISM_FORECAST_WORKERS', 2)))
@@ -0,0 +1,280 @@
+"""
+Prophet model fitting and caching for the Cultural Tourism Dashboard forecasts
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+from tracing import span
+
+MODEL_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'models')
+FORECAST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'forecasts')
+
+# 'fast' is the NumPy engine in fast_forecast.py; 'prophet' fits the full Stan model
+FORECAST_ENGINES = ['fast', 'prophet']
+
+# Fewer daily points than this and the dashboard does not forecast
+MIN_HISTORY_POINTS = 30
+
+# Hyperparameters of the dashboard's forecast model; part of every cache key
+PROPHET_PARAMS = {
+    'yearly_seasonality': True,
+    'weekly_seasonality': True,
+    'daily_seasonality': False,
+    'changepoint_prior_scale': 0.05,
+}
+CUSTOM_SEASONALITIES = [
+    {'name': 'monthly', 'period': 30.5, 'fourier_order': 5},
+]
+
+# Incremental updates refit from scratch when the appended tail is more than this share of
+# the previous history, or when the previous model's error on the tail is more than
+# DRIFT_RATIO times its error on the history it was fitted to
+MAX_TAIL_FRACTION = 0.25
+DRIFT_RATIO = 2.0
+
+
+def daily_series(frame):
+    """Total visitors per date as the ds/y frame Prophet expects"""
+    daily_visitors = frame.groupby('Date')['VISITORS'].sum().reset_index()
+    daily_visitors.columns = ['ds', 'y']
+    return daily_visitors
+
+
+def fit_prophet(history, params=PROPHET_PARAMS, seasonalities=CUSTOM_SEASONALITIES, init=None):
+    """Fit a Prophet model to a ds/y frame, optionally warm-started from another model's parameters"""
+    # Prophet (with cmdstanpy and matplotlib) takes over a second to import, so it is only
+    # loaded once a Prophet fit or cached model is actually needed
+    from prophet import Prophet
+
+    model = Prophet(**params)
+
+    # Add custom seasonalities
+    for seasonality in seasonalities:
+        model.add_seasonality(**seasonality)
+
+    if init is not None:
+        model.fit(history, init=init)
+    else:
+        model.fit(history)
+    return model
+
+
+def point_forecast(model, ds):
+    """yhat at the given dates, skipping the uncertainty simulation that makes predict() slow"""
+    frame = model.setup_dataframe(pd.DataFrame({'ds': ds}))
+    seasonal = model.predict_seasonal_components(frame)
+    trend = model.predict_trend(frame)
+    return (trend * (1 + seasonal['multiplicative_terms']) + seasonal['additive_terms']).to_numpy()
+
+
+def drift_check(model, previous_rows, history):
+    """Whether `model`, fitted to the first `previous_rows` of `history`, still explains the rows after them.
+
+    Returns (ok, reason); reason says why a full refit is needed.
+    """
+    tail = len(history) - previous_rows
+    if tail > MAX_TAIL_FRACTION * previous_rows:
+        return False, f"{tail} new days is more than {MAX_TAIL_FRACTION:.0%} of the history"
+    errors = (history['y'].to_numpy(dtype=float) - point_forecast(model, history['ds'])) ** 2
+    fitted_rmse = errors[:previous_rows].mean() ** 0.5
+    tail_rmse = errors[previous_rows:].mean() ** 0.5
+    if tail_rmse > DRIFT_RATIO * max(fitted_rmse, 1e-9):
+        return False, f"error on new days is {tail_rmse / max(fitted_rmse, 1e-9):.1f}x the fitted error"
+    return True, None
+
+
+def data_fingerprint(history):
+    """Content hash of a ds/y series, so a cached model is only reused for identical data"""
+    hashed = pd.util.hash_pandas_object(history[['ds', 'y']], index=False).values
+    return hashlib.sha256(hashed.tobytes()).hexdigest()
+
+
+class ModelCache:
+    """Fitted models held in an in-memory LRU and persisted as Prophet JSON on disk.
+
+    Each series also records which model was fitted to it last. When a series
+    comes back with days appended to that history, the new model is
+    warm-started from the previous one instead of being fitted from scratch.
+    """
+
+    def __init__(self, directory=MODEL_CACHE_DIR, max_memory=16):
+        self.directory = directory
+        self.max_memory = max_memory
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(state, event, fingerprint, params=PROPHET_PARAMS, seasonalities=CUSTOM_SEASONALITIES):
+        spec = json.dumps([state, event, fingerprint, params, seasonalities], sort_keys=True, default=str)
+        return hashlib.sha256(spec.encode()).hexdigest()
+
+    @staticmethod
+    def series_key(state, event, params=PROPHET_PARAMS, seasonalities=CUSTOM_SEASONALITIES):
+        spec = json.dumps([state, event, params, seasonalities], sort_keys=True, default=str)
+        return hashlib.sha256(spec.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _latest_path(self, series_key):
+        return os.path.join(self.directory, f"{series_key}.latest.json")
+
+    def get(self, key):
+        """Cached model for a key, from memory or disk, or None"""
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key]
+        from prophet.serialize import model_from_json
+
+        try:
+            with open(self._path(key)) as f:
+                model = model_from_json(f.read())
+        except (OSError, ValueError):
+            return None
+        self._remember(key, model)
+        return model
+
+    def put(self, key, model):
+        from prophet.serialize import model_to_json
+
+        tmp_path = self._path(key) + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(model_to_json(model))
+        os.replace(tmp_path, self._path(key))
+        self._remember(key, model)
+
+    def _remember(self, key, model):
+        with self._lock:
+            self._models[key] = model
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_memory:
+                self._models.popitem(last=False)
+
+    def _previous(self, series_key, history):
+        """(model, rows) last fitted to this series if its history is a strict prefix of `history`"""
+        try:
+            with open(self._latest_path(series_key)) as f:
+                latest = json.load(f)
+        except (OSError, ValueError):
+            return None, 0
+        rows = latest['rows']
+        if rows >= len(history) or data_fingerprint(history.head(rows)) != latest['fingerprint']:
+            return None, 0
+        return self.get(latest['key']), rows
+
+    def _record_latest(self, series_key, key, history):
+        tmp_path = self._latest_path(series_key) + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'key': key, 'rows': len(history), 'fingerprint': data_fingerprint(history)}, f)
+        os.replace(tmp_path, self._latest_path(series_key))
+
+    def update(self, history, state='All', event='All', params=PROPHET_PARAMS, seasonalities=CUSTOM_SEASONALITIES):
+        """Model for this exact series and configuration, and how it was obtained.
+
+        The mode is 'cached' for a hit, 'warm' when the series only gained new days
+        and the previous model passed drift_check(), and 'full' otherwise.
+        """
+        history = history.sort_values('ds').reset_index(drop=True)
+        key = self.key(state, event, data_fingerprint(history), params, seasonalities)
+        model = self.get(key)
+        if model is not None:
+            return model, 'cached'
+
+        series_key = self.series_key(state, event, params, seasonalities)
+        previous, rows = self._previous(series_key, history)
+        mode = 'full'
+        if previous is not None:
+            ok, reason = drift_check(previous, rows, history)
+            if ok:
+                mode = 'warm'
+            else:
+                print(f"Refitting {state} / {event} from scratch: {reason}")
+        from prophet.utilities import warm_start_params
+
+        init = warm_start_params(previous) if mode == 'warm' else None
+        with span('prophet.fit', state=state, event=event, mode=mode, rows=len(history)):
+            model = fit_prophet(history, params, seasonalities, init=init)
+        self.put(key, model)
+        self._record_latest(series_key, key, history)
+        return model, mode
+
+    def get_or_fit(self, history, state='All', event='All', params=PROPHET_PARAMS,
+                   seasonalities=CUSTOM_SEASONALITIES):
+        """Reuse the model fitted to this exact series and configuration, fitting it (incrementally if possible) on a miss"""
+        return self.update(history, state, event, params, seasonalities)[0]
+
+
+@st.cache_resource
+def get_model_cache():
+    """Process-wide model cache under TOURISM_MODEL_CACHE_DIR"""
+    return ModelCache(
+        os.getenv('TOURISM_MODEL_CACHE_DIR') or MODEL_CACHE_DIR,
+        max_memory=int(os.getenv('TOURISM_MODEL_CACHE_SIZE', 16)),
+    )
+
+
+def predict(model, periods):
+    """History plus `periods` future days; only prediction runs, the model is not refitted"""
+    future = model.make_future_dataframe(periods=periods)
+    return model.predict(future)
+
+
+class ForecastStore:
+    """Forecasts written by forecast_batch.py: one Parquet file of future rows plus a JSON run report"""
+
+    def __init__(self, directory=FORECAST_DIR):
+        self.directory = directory
+        self.forecasts_path = os.path.join(directory, 'forecasts.parquet')
+        self.report_path = os.path.join(directory, 'report.json')
+
+    def write(self, forecasts, report):
+        os.makedirs(self.directory, exist_ok=True)
+        forecasts.to_parquet(self.forecasts_path + '.tmp', index=False)
+        os.replace(self.forecasts_path + '.tmp', self.forecasts_path)
+        with open(self.report_path + '.tmp', 'w') as f:
+            json.dump(report, f, indent=2)
+        os.replace(self.report_path + '.tmp', self.report_path)
+
+    def read(self):
+        """(forecasts, report), or (None, None) when no batch run has completed"""
+        try:
+            with open(self.report_path) as f:
+                report = json.load(f)
+            return pd.read_parquet(self.forecasts_path), report
+        except (OSError, ValueError):
+            return None, None
+
+
+@st.cache_resource(max_entries=1)
+def _load_store(directory, modified):
+    # `modified` makes a new batch run invalidate the cached read
+    forecasts, report = ForecastStore(directory).read()
+    if forecasts is None:
+        return None, {}, None
+    fingerprints = {(entry['state'], entry['event']): entry['fingerprint']
+                    for entry in report['series'] if entry['status'] == 'ok'}
+    # Runs from before engines were selectable were all Prophet
+    return forecasts.groupby(['STATE', 'EVENT'], observed=True), fingerprints, report.get('engine', 'prophet')
+
+
+def stored_forecast(history, state, event, periods, engine='prophet'):
+    """Batch forecast for this series if `engine` produced one for exactly this history covering `periods` days"""
+    store = ForecastStore(os.getenv('TOURISM_FORECAST_DIR') or FORECAST_DIR)
+    if not os.path.exists(store.report_path):
+        return None
+    groups, fingerprints, stored_engine = _load_store(store.directory, os.path.getmtime(store.report_path))
+    if stored_engine != engine or fingerprints.get((state, event)) != data_fingerprint(history):
+        return None
+    forecast = groups.get_group((state, event))
+    if len(forecast) < periods:
+        return None
+    return forecast.head(periods)[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].reset_index(drop=True)
@@ -0,0 +1,107 @@
+"""
+Build the compact, analysis-ready DataFrame used by Cultural Tourism Dashboard
+"""
+
+import numpy as np
+import pandas as pd
+
+REGIONS = {
+    'North': ['Punjab', 'Himachal Pradesh', 'Uttar Pradesh'],
+    'South': ['Kerala', 'Karnataka', 'Tamil Nadu'],
+    'West': ['Rajasthan', 'Gujarat', 'Maharashtra', 'Goa'],
+    'East': ['West Bengal', 'Odisha', 'Assam'],
+    'Northeast': ['Meghalaya', 'Manipur']
+}
+
+# Flattened once so region lookup is a dict hit per distinct state, not a scan per row
+STATE_REGIONS = {state: region for region, states in REGIONS.items() for state in states}
+
+CATEGORICAL_COLUMNS = ['STATE', 'EVENT', 'ART_FORM', 'TOURISM_LEVEL', 'REGION', 'QUARTER']
+# Only non-additive integers are downcast: pandas groupby sums keep the input dtype,
+# so narrow VISITORS/REVENUE_INR/LOCAL_EMPLOYMENT columns would overflow in totals
+INTEGER_COLUMNS = ['MONTH', 'YEAR']
+MEASURE_COLUMNS = ['VISITORS', 'REVENUE_INR', 'LOCAL_EMPLOYMENT']
+
+QUARTER_LABELS = ['Q1', 'Q2', 'Q3', 'Q4']
+
+
+def get_region(state):
+    """Map states to regions"""
+    return STATE_REGIONS.get(state, 'Other')
+
+
+def derive_regions(states):
+    """Vectorized get_region(): maps each distinct state once, then gathers by category code"""
+    states = states.astype('category')
+    regions = pd.Index([get_region(state) for state in states.cat.categories])
+    categories = regions.unique()
+    # Trailing -1 keeps missing states (code -1) missing
+    lookup = np.append(categories.get_indexer(regions), -1)
+    return pd.Series(pd.Categorical.from_codes(lookup[states.cat.codes], categories), index=states.index)
+
+
+def derive_quarters(dates):
+    """'Q1'..'Q4' labels for a datetime Series without a per-row lambda"""
+    return pd.Series(pd.Categorical.from_codes(dates.dt.quarter - 1, QUARTER_LABELS), index=dates.index)
+
+
+def to_datetime(values):
+    """pd.to_datetime(), skipped for values that already are datetimes (it would scan them one by one)"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return pd.to_datetime(values)
+
+
+def widen_measure(values):
+    """Measure column as int64 for safe sums, or nullable Int64 when some values are missing"""
+    # Backends may hand back narrow ints (Arrow batches, offline files), or floats when a column has NULLs
+    if values.hasnans:
+        is_whole = pd.api.types.is_integer_dtype(values) or (values.dropna() % 1 == 0).all()
+        return values.astype('Int64') if is_whole else values
+    if pd.api.types.is_integer_dtype(values) and values.dtype != 'int64':
+        return values.astype('int64')
+    return values
+
+
+def build_frame(df, report=False):
+    """Normalize a raw query result: datetime Date, derived columns, categoricals and downcast numerics"""
+    before = df.memory_usage(deep=True) if report else None
+
+    # Ensure date column is datetime and rename if needed
+    if 'DATE' in df.columns:
+        df['Date'] = to_datetime(df['DATE'])
+        df = df.drop('DATE', axis=1)
+    elif 'Date' in df.columns:
+        df['Date'] = to_datetime(df['Date'])
+
+    # Add derived columns if not present in Snowflake
+    if 'MONTH' not in df.columns:
+        df['MONTH'] = df['Date'].dt.month
+    if 'YEAR' not in df.columns:
+        df['YEAR'] = df['Date'].dt.year
+    if 'QUARTER' not in df.columns:
+        df['QUARTER'] = derive_quarters(df['Date'])
+    if 'REGION' not in df.columns:
+        df['REGION'] = derive_regions(df['STATE'])
+
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    for column in INTEGER_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+    for column in MEASURE_COLUMNS:
+        if column in df.columns:
+            df[column] = widen_measure(df[column])
+
+    if report:
+        print(memory_report(before, df.memory_usage(deep=True)))
+    return df
+
+
+def memory_report(before, after):
+    """Per-column bytes before and after build_frame(), as printed to the server log"""
+    report = pd.DataFrame({'before': before, 'after': after}).fillna(0).astype('int64')
+    report.loc['TOTAL'] = report.sum()
+    report['saved_%'] = (100 * (1 - report['after'] / report['before'].where(report['before'] > 0))).round(1)
+    return report
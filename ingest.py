@@ -0,0 +1,316 @@
+"""
+Bulk-load event files into CULTURAL_TOURISM_EVENTS for the Cultural Tourism Dashboard
+
+Files are streamed in chunks, normalized to the warehouse schema and uploaded
+by parallel workers. Every batch is recorded in a ledger table with the source
+rows it covers, so re-running a load (with any chunk size) skips the rows that
+already landed and an interrupted load resumes where it stopped.
+
+Usage:
+    python ingest.py data/tourism_data_sample.csv --chunk-rows 500000 --workers 4
+    python ingest.py events.parquet --target local --local-db data/ingest.sqlite
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from frame_builder import derive_regions
+from offline_backend import normalize_table
+from snowflake_utils import ConnectionPool, SnowflakeBackend
+from tracing import span
+
+TABLE = 'CULTURAL_TOURISM_EVENTS'
+LEDGER = 'CULTURAL_TOURISM_BATCHES'
+LOCAL_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'ingest.sqlite')
+
+# Column -> warehouse type, in table order. MONTH/YEAR/QUARTER are derived by the
+# dashboard's query, so they are not stored; BATCH_ID ties each row to the load that wrote it.
+TABLE_COLUMNS = {
+    'DATE': 'DATE',
+    'STATE': 'VARCHAR',
+    'EVENT': 'VARCHAR',
+    'ART_FORM': 'VARCHAR',
+    'VISITORS': 'NUMBER(38,0)',
+    'TOURISM_LEVEL': 'VARCHAR',
+    'REVENUE_INR': 'NUMBER(38,0)',
+    'LOCAL_EMPLOYMENT': 'NUMBER(38,0)',
+    'REGION': 'VARCHAR',
+    'BATCH_ID': 'VARCHAR',
+}
+# A batch holds source rows FIRST_ROW .. FIRST_ROW + ROW_COUNT - 1 (0-based, header excluded)
+LEDGER_COLUMNS = {'BATCH_ID': 'VARCHAR', 'SOURCE': 'VARCHAR', 'FIRST_ROW': 'NUMBER(38,0)',
+                  'ROW_COUNT': 'NUMBER(38,0)', 'LOADED_AT': 'NUMBER(38,3)'}
+TEXT_COLUMNS = ['STATE', 'EVENT', 'ART_FORM', 'TOURISM_LEVEL', 'REGION']
+MEASURE_COLUMNS = ['VISITORS', 'REVENUE_INR', 'LOCAL_EMPLOYMENT']
+
+
+def iter_chunks(path, chunk_rows):
+    """Yield pyarrow Tables of `chunk_rows` rows (the last may be shorter) from a CSV or Parquet file"""
+    if path.endswith('.parquet'):
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_rows)
+    else:
+        batches = pa_csv.open_csv(path, convert_options=pa_csv.ConvertOptions(
+            column_types={'Date': pa.string(), 'DATE': pa.string()}))
+    pending, rows = [], 0
+    for batch in batches:
+        pending.append(batch)
+        rows += batch.num_rows
+        while rows >= chunk_rows:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_rows)
+            rest = table.slice(chunk_rows)
+            pending, rows = rest.to_batches(), rest.num_rows
+    if rows:
+        yield pa.Table.from_batches(pending)
+
+
+def normalize_chunk(table):
+    """Warehouse-schema DataFrame for one chunk: upper-case columns, typed values and a region for every row"""
+    table = normalize_table(table)
+    df = table.to_pandas()  # DATE comes back as datetime.date, which loads as a DATE column
+    for column in TEXT_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('string').str.strip()
+    if 'REGION' not in df.columns:
+        df['REGION'] = pd.Series(pd.NA, index=df.index, dtype='string')
+    missing = df['REGION'].isna()
+    if missing.any():
+        df.loc[missing, 'REGION'] = derive_regions(df.loc[missing, 'STATE']).astype('string')
+    for column in MEASURE_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors='raise').astype('int64')
+    return df[[column for column in TABLE_COLUMNS if column != 'BATCH_ID']]
+
+
+def batch_id(source, first_row, df):
+    """Stable ID for a batch: the same rows at the same position in the same file always get the same ID"""
+    content = pd.util.hash_pandas_object(df, index=False).values.tobytes()
+    digest = hashlib.sha256(f"{os.path.basename(source)}:{first_row}:".encode() + content)
+    return digest.hexdigest()[:32]
+
+
+def uncovered(start, stop, ranges):
+    """Parts of source rows [start, stop) not in any of the loaded (first_row, row_count) ranges"""
+    parts = []
+    for first_row, row_count in sorted(ranges):
+        if first_row >= stop:
+            break
+        if first_row > start:
+            parts.append((start, first_row))
+        start = max(start, first_row + row_count)
+    if start < stop:
+        parts.append((start, stop))
+    return parts
+
+
+class SnowflakeTarget:
+    """Loads chunks with write_pandas over pooled connections, one connection per worker"""
+    name = 'snowflake'
+
+    def __init__(self, workers=4, table=TABLE, ledger=LEDGER):
+        self.pool = ConnectionPool(SnowflakeBackend(), max_size=workers)
+        self.table = table
+        self.ledger = ledger
+
+    def _execute(self, statements):
+        connection = self.pool.acquire()
+        try:
+            cursor = connection.cursor()
+            results = [cursor.execute(query, params).fetchall() for query, params in statements]
+        except Exception:
+            self.pool.release(connection, discard=True)
+            raise
+        self.pool.release(connection)
+        return results
+
+    def prepare(self):
+        """Create the events and ledger tables if needed; older event tables gain the BATCH_ID column"""
+        columns = ', '.join(f"{column} {kind}" for column, kind in TABLE_COLUMNS.items())
+        ledger_columns = ', '.join(f"{column} {kind}" for column, kind in LEDGER_COLUMNS.items())
+        self._execute([
+            (f"CREATE TABLE IF NOT EXISTS {self.table} ({columns})", None),
+            (f"ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS BATCH_ID VARCHAR", None),
+            (f"CREATE TABLE IF NOT EXISTS {self.ledger} ({ledger_columns})", None),
+        ])
+
+    def completed(self, source):
+        """(first_row, row_count) of every batch of this file already loaded"""
+        rows = self._execute([(f"SELECT FIRST_ROW, ROW_COUNT FROM {self.ledger} WHERE SOURCE = ?",
+                               [os.path.basename(source)])])[0]
+        return [(int(first_row), int(row_count)) for first_row, row_count in rows]
+
+    def load(self, batch, source, first_row, df):
+        """Stage the batch, then move it into the events table and record it in one transaction.
+
+        write_pandas runs DDL, which commits in Snowflake, so it fills a staging
+        table outside the transaction; the rows and their ledger entry land together.
+        """
+        from snowflake.connector.pandas_tools import write_pandas
+
+        staging = f"{self.table}_STAGE_{batch[:16].upper()}"
+        connection = self.pool.acquire()
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"CREATE OR REPLACE TRANSIENT TABLE {staging} LIKE {self.table}")
+            success, _, rows, _ = write_pandas(connection, df.assign(BATCH_ID=batch), staging,
+                                               quote_identifiers=False, compression='snappy')
+            if not success:
+                raise RuntimeError(f"COPY INTO {staging} did not load batch {batch}")
+            cursor.execute("BEGIN")
+            try:
+                cursor.execute(f"DELETE FROM {self.table} WHERE BATCH_ID = ?", [batch])
+                cursor.execute(f"INSERT INTO {self.table} SELECT * FROM {staging}")
+                cursor.execute(f"INSERT INTO {self.ledger} (BATCH_ID, SOURCE, FIRST_ROW, ROW_COUNT, LOADED_AT) "
+                               f"VALUES (?, ?, ?, ?, ?)", [batch, os.path.basename(source), first_row, rows, time.time()])
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+        except Exception:
+            cursor.close()
+            self.pool.release(connection, discard=True)
+            raise
+        cursor.close()
+        self.pool.release(connection)
+        return rows
+
+    def close(self):
+        self.pool.close_all()
+
+
+class LocalTarget:
+    """sqlite stand-in with the same tables and semantics, for trying loads without a warehouse"""
+    name = 'local'
+
+    def __init__(self, path=LOCAL_DB, table=TABLE, ledger=LEDGER):
+        self.path = path
+        self.table = table
+        self.ledger = ledger
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _connect(self):
+        # Workers write concurrently; sqlite serializes them on the database lock
+        return sqlite3.connect(self.path, timeout=300)
+
+    def prepare(self):
+        with self._connect() as connection:
+            connection.execute(f"CREATE TABLE IF NOT EXISTS {self.table} "
+                               f"({', '.join(f'{column} {kind}' for column, kind in TABLE_COLUMNS.items())})")
+            connection.execute(f"CREATE TABLE IF NOT EXISTS {self.ledger} "
+                               f"({', '.join(f'{column} {kind}' for column, kind in LEDGER_COLUMNS.items())})")
+
+    def completed(self, source):
+        with self._connect() as connection:
+            rows = connection.execute(f"SELECT FIRST_ROW, ROW_COUNT FROM {self.ledger} WHERE SOURCE = ?",
+                                      [os.path.basename(source)]).fetchall()
+        return [(int(first_row), int(row_count)) for first_row, row_count in rows]
+
+    def load(self, batch, source, first_row, df):
+        connection = self._connect()
+        try:
+            # One transaction: the rows and their ledger entry land together or not at all
+            with connection:
+                connection.execute(f"DELETE FROM {self.table} WHERE BATCH_ID = ?", [batch])
+                df.assign(DATE=df['DATE'].astype(str), BATCH_ID=batch).to_sql(
+                    self.table, connection, if_exists='append', index=False)
+                connection.execute(f"INSERT INTO {self.ledger} (BATCH_ID, SOURCE, FIRST_ROW, ROW_COUNT, LOADED_AT) "
+                                   f"VALUES (?, ?, ?, ?, ?)",
+                                   [batch, os.path.basename(source), first_row, len(df), time.time()])
+        finally:
+            connection.close()
+        return len(df)
+
+    def close(self):
+        pass
+
+
+def _load_chunk(target, completed, source, start, table):
+    # Only the rows no earlier run loaded; an earlier run may have used another chunk size
+    parts = uncovered(start, start + table.num_rows, completed)
+    if not parts:
+        return 'skipped', table.num_rows
+    with span('ingest.chunk', source=os.path.basename(source), first_row=start, rows=table.num_rows):
+        rows = 0
+        for first_row, stop in parts:
+            df = normalize_chunk(table.slice(first_row - start, stop - first_row))
+            rows += target.load(batch_id(source, first_row, df), source, first_row, df)
+        return 'loaded', rows
+
+
+def ingest(paths, target, chunk_rows=500_000, workers=4):
+    """Load every file through `target`; returns per-file counts of loaded, skipped and failed chunks.
+
+    Reading stays one chunk ahead of each worker, so memory holds about
+    2 x workers chunks however large the files are.
+    """
+    target.prepare()
+    summary = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ingest') as executor:
+        for path in paths:
+            completed = target.completed(path)
+            counts = {'loaded': 0, 'skipped': 0, 'failed': 0, 'rows': 0, 'errors': []}
+            in_flight = {}
+
+            def collect(done):
+                for future in done:
+                    start = in_flight.pop(future)
+                    try:
+                        status, rows = future.result()
+                    except Exception as e:
+                        counts['failed'] += 1
+                        counts['errors'].append(f"rows from {start}: {e!r}")
+                        continue
+                    counts[status] += 1
+                    counts['rows'] += rows if status == 'loaded' else 0
+
+            start = 0
+            for table in iter_chunks(path, chunk_rows):
+                in_flight[executor.submit(_load_chunk, target, completed, path, start, table)] = start
+                start += table.num_rows
+                if len(in_flight) >= 2 * workers:
+                    collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+            collect(wait(in_flight).done)
+            summary[path] = counts
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load CSV/Parquet event files into CULTURAL_TOURISM_EVENTS")
+    parser.add_argument('paths', nargs='+', help="CSV or Parquet files")
+    parser.add_argument('--target', choices=['snowflake', 'local'], default='snowflake')
+    parser.add_argument('--local-db', default=LOCAL_DB, help="sqlite file for --target local")
+    parser.add_argument('--chunk-rows', type=int, default=500_000,
+                        help="Rows per uploaded batch; may differ between a run and its resume")
+    parser.add_argument('--workers', type=int, default=4, help="Chunks uploaded in parallel")
+    args = parser.parse_args()
+
+    target = LocalTarget(args.local_db) if args.target == 'local' else SnowflakeTarget(args.workers)
+    started = time.monotonic()
+    try:
+        summary = ingest(args.paths, target, args.chunk_rows, args.workers)
+    finally:
+        target.close()
+
+    failed = 0
+    for path, counts in summary.items():
+        print(f"{path}: {counts['rows']:,} rows in {counts['loaded']} chunks loaded, "
+              f"{counts['skipped']} already loaded, {counts['failed']} failed")
+        for error in counts['errors']:
+            print(f"  {error}")
+        failed += counts['failed']
+    print(f"Finished in {time.monotonic() - started:.1f}s")
+    if failed:
+        raise SystemExit(f"{failed} chunks failed; re-run the same command to retry them")
+
+
+if __name__ == '__main__':
+    main()
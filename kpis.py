@@ -0,0 +1,45 @@
+"""
+Headline numbers for the Cultural Tourism Dashboard's metric cards and Insights tab, from one pass over cube cells
+"""
+
+from compute_engine import get_compute_engine
+from cube import CUBE_MEASURES
+from tracing import span
+
+ECONOMIC_COLUMNS = ['REVENUE_INR', 'LOCAL_EMPLOYMENT', 'VISITORS']
+
+
+class KPIs:
+    """The cards, Insights and economic impact figures for one selection of cube cells"""
+
+    def __init__(self, states, months, events, levels):
+        totals = states[CUBE_MEASURES].sum()
+        self.visitors = int(totals['VISITORS'])
+        self.events = int(totals['EVENTS'])
+        self.revenue = int(totals['REVENUE_INR'])
+        self.employment = int(totals['LOCAL_EMPLOYMENT'])
+
+        self.peak_month = int(months.idxmax())
+        self.peak_state = states['VISITORS'].idxmax()
+        self.peak_event = events.idxmax()
+
+        # Events per tourism level, e.g. {'High': 120, 'Medium': 300, 'Low': 80}
+        self.level_counts = {level: int(count) for level, count in levels.items()}
+
+        economic = states[ECONOMIC_COLUMNS].reset_index()
+        economic['Revenue_per_Visitor'] = economic['REVENUE_INR'] / economic['VISITORS']
+        economic['Employment_per_1000_Visitors'] = (economic['LOCAL_EMPLOYMENT'] / economic['VISITORS']) * 1000
+        # One row per state, like the economic_impact aggregate plus per-visitor ratios
+        self.economic = economic
+
+
+def compute_kpis(cells, engine=None):
+    """KPIs for the given cube cells: one group-by per dimension, shared by the cards, Insights and economics"""
+    engine = engine or get_compute_engine()
+    with span('kpis', cells=len(cells)):
+        # Per-state sums: the cards' totals and the economic impact table are both read off these
+        states = engine.group_sum(cells, ['STATE'], CUBE_MEASURES).set_index('STATE')
+        months = engine.group_sum(cells, ['MONTH'], ['VISITORS']).set_index('MONTH')['VISITORS']
+        events = engine.group_sum(cells, ['EVENT'], ['VISITORS']).set_index('EVENT')['VISITORS']
+        levels = engine.group_sum(cells, ['TOURISM_LEVEL'], ['EVENTS']).set_index('TOURISM_LEVEL')['EVENTS']
+        return KPIs(states, months, events, levels)
@@ -0,0 +1,177 @@
+"""
+Offline backend for Cultural Tourism Dashboard, serving memory-mapped Arrow files built from CSVs
+"""
+
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import streamlit as st
+
+from compute_engine import get_compute_engine
+from filter_compiler import normalize_filters, check_column, LOWER_BOUND_FILTERS
+from snowflake_utils import DASHBOARD_AGGREGATES, SAMPLE_DATA_PATH
+from tracing import span
+
+OFFLINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'offline')
+
+# Filter key -> column in the converted files (derived date parts are stored, not computed)
+OFFLINE_COLUMNS = {
+    'art_form': 'ART_FORM',
+    'date_from': 'DATE',
+    'event': 'EVENT',
+    'month': 'MONTH',
+    'quarter': 'QUARTER',
+    'region': 'REGION',
+    'state': 'STATE',
+    'tourism_level': 'TOURISM_LEVEL',
+    'year': 'YEAR',
+}
+
+# Rows per DataFrame when the store is streamed
+OFFLINE_BATCH_ROWS = 1_000_000
+
+# Derived in the warehouse query rather than read from the CSV
+DERIVED_COLUMNS = ['MONTH', 'YEAR', 'QUARTER']
+
+
+def normalize_table(table):
+    """Upper-case CSV headers to the warehouse schema and derive the date parts"""
+    table = table.rename_columns([column.upper() for column in table.column_names])
+    table = table.drop_columns([column for column in DERIVED_COLUMNS if column in table.column_names])
+    dates = table['DATE'].cast(pa.date32())
+    table = table.set_column(table.column_names.index('DATE'), 'DATE', dates)
+    table = table.append_column('MONTH', pc.month(dates).cast(pa.int8()))
+    table = table.append_column('YEAR', pc.year(dates).cast(pa.int16()))
+    return table.append_column('QUARTER', pc.quarter(dates).cast(pa.int8()))
+
+
+def convert_csv(csv_path, arrow_path):
+    """Stream a CSV into an uncompressed Arrow IPC (Feather v2) file that can be memory-mapped"""
+    reader = pa_csv.open_csv(csv_path, convert_options=pa_csv.ConvertOptions(
+        column_types={'Date': pa.string(), 'DATE': pa.string()}))
+    tmp_path = arrow_path + '.tmp'
+    writer = None
+    try:
+        for batch in reader:
+            table = normalize_table(pa.Table.from_batches([batch]))
+            if writer is None:
+                writer = pa.ipc.new_file(tmp_path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, arrow_path)
+
+
+class OfflineStore:
+    """Arrow copies of one or more CSV files, converted once and memory-mapped on every read"""
+
+    def __init__(self, csv_paths, directory=OFFLINE_DIR):
+        self.csv_paths = list(csv_paths)
+        self.directory = directory
+        self._table = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _arrow_path(self, csv_path):
+        name = os.path.splitext(os.path.basename(csv_path))[0]
+        return os.path.join(self.directory, f"{name}.arrow")
+
+    @property
+    def table(self):
+        """All files as one table backed by the memory maps; nothing is copied into process memory"""
+        if self._table is None:
+            tables = []
+            for csv_path in self.csv_paths:
+                arrow_path = self._arrow_path(csv_path)
+                if not os.path.exists(arrow_path) or os.path.getmtime(arrow_path) < os.path.getmtime(csv_path):
+                    convert_csv(csv_path, arrow_path)
+                tables.append(pa.ipc.open_file(pa.memory_map(arrow_path)).read_all())
+            self._table = pa.concat_tables(tables, promote_options='permissive')
+        return self._table
+
+    def filtered(self, filters=None):
+        """Rows matching the dashboard filters"""
+        table = self.table
+        mask = None
+        for key, values in normalize_filters(filters).items():
+            column = table[OFFLINE_COLUMNS[key]]
+            if key in LOWER_BOUND_FILTERS:
+                condition = pc.greater_equal(column, pa.scalar(values[0]).cast(column.type))
+            else:
+                condition = pc.is_in(column, value_set=pa.array(values).cast(column.type))
+            mask = condition if mask is None else pc.and_(mask, condition)
+        return table if mask is None else table.filter(mask)
+
+
+@st.cache_resource
+def get_offline_store():
+    """Process-wide store for the CSVs listed in TOURISM_OFFLINE_CSV (defaults to the bundled sample)"""
+    csv_paths = os.getenv('TOURISM_OFFLINE_CSV') or SAMPLE_DATA_PATH
+    return OfflineStore(csv_paths.split(os.pathsep), os.getenv('TOURISM_OFFLINE_DIR') or OFFLINE_DIR)
+
+
+class OfflineConnection:
+    """Stand-in for SnowflakeConnection's dashboard methods, answered from an OfflineStore.
+
+    There is no SQL engine behind it, so it has no execute_query() or fetch
+    methods, and the table mirror cannot be used with it.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or get_offline_store()
+        self.connection = None
+
+    def connect(self):
+        return True
+
+    def disconnect(self):
+        pass
+
+    def load_cultural_data(self, filters=None):
+        """Load cultural tourism data from the offline store.
+
+        The frame is a private copy: the memory maps make reading the rows fast,
+        but (as with the warehouse backends) the pandas frame holds its own memory.
+        """
+        with span('load_cultural_data', backend='offline') as load_span:
+            table = self.store.filtered(filters).sort_by([('DATE', 'descending')])
+            if load_span:
+                load_span.set(rows=table.num_rows, bytes=table.nbytes)
+            # split_blocks skips consolidating columns into 2-D blocks, a second copy at load
+            return table.to_pandas(date_as_object=False, split_blocks=True)
+
+    def iter_cultural_data(self, filters=None, batch_rows=OFFLINE_BATCH_ROWS):
+        """Stream the offline store as DataFrames of at most batch_rows rows"""
+        table = self.store.filtered(filters)
+        # Slices are views on the memory maps, so only the converted frame is held in memory
+        for start in range(0, table.num_rows, batch_rows):
+            yield table.slice(start, batch_rows).to_pandas(date_as_object=False)
+
+    def run_aggregate(self, name, filters=None):
+        return get_compute_engine().aggregate(DASHBOARD_AGGREGATES[name], self.load_cultural_data(filters))
+
+    def get_unique_values(self, column_name, filters=None):
+        """Get unique values for a specific column from the offline store"""
+        column_name = check_column(column_name)
+        values = pc.unique(self.store.filtered(filters)[column_name])
+        return pd.DataFrame({column_name: values.sort().to_pandas()})
+
+    def get_filter_combinations(self):
+        """Every (STATE, EVENT, YEAR) in the offline store, with its row count"""
+        grouped = self.store.table.group_by(['STATE', 'EVENT', 'YEAR']).aggregate([([], 'count_all')])
+        return grouped.rename_columns(['STATE', 'EVENT', 'YEAR', 'ROW_COUNT']).to_pandas()
+
+    def get_summary_statistics(self, filters=None):
+        """Get summary statistics for the offline store"""
+        table = self.store.filtered(filters)
+        return pd.DataFrame([{
+            'TOTAL_EVENTS': table.num_rows,
+            'TOTAL_VISITORS': pc.sum(table['VISITORS']).as_py(),
+            'TOTAL_REVENUE': pc.sum(table['REVENUE_INR']).as_py(),
+            'TOTAL_EMPLOYMENT': pc.sum(table['LOCAL_EMPLOYMENT']).as_py(),
+            'AVG_VISITORS_PER_EVENT': pc.mean(table['VISITORS']).as_py(),
+            'AVG_REVENUE_PER_EVENT': pc.mean(table['REVENUE_INR']).as_py(),
+        }])
@@ -0,0 +1,159 @@
+"""
+Process-wide, read-only events dataset for Cultural Tourism Dashboard, swapped atomically on refresh
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+from dotenv import load_dotenv
+
+from tracing import span
+
+load_dotenv()
+
+# Every session reads the same frame, so frames derived from it must never write through to it.
+# pandas 3 always copies on write; pandas 2 has to be told (the option is deprecated in 3).
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+# Seconds a loaded dataset is served before the next rerun reloads it; 0 keeps it until invalidated
+DATA_MAX_AGE = int(os.getenv('TOURISM_DATA_MAX_AGE', 0))
+
+# Directory (ideally on tmpfs, e.g. /dev/shm/tourism) where the dataset is published as an
+# Arrow file, so other server processes on the host read it instead of querying the warehouse;
+# empty loads it in every process. Each process still converts it into its own pandas frame.
+SHARED_DIR = os.getenv('TOURISM_SHARED_DIR') or None
+
+POINTER_NAME = 'current.json'
+
+
+class Dataset:
+    """One immutable version of the events frame, plus structures derived from it.
+
+    Every session reads the same frame, so nothing may modify it; with
+    copy-on-write (enabled above on pandas 2), frames derived from it never
+    write through to it. A dataset aggregated while streaming has no frame,
+    only the structures it was built with.
+    """
+
+    def __init__(self, df, version=None, loaded_at=None, derived=None):
+        self.df = df
+        self.version = version
+        self.loaded_at = loaded_at or time.time()
+        self._derived = dict(derived or {})
+        # Reentrant, so one derived structure can be built from another
+        self._lock = threading.RLock()
+
+    def derived(self, name, build):
+        """build(df), computed once per version and shared by every session"""
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = build(self.df)
+            return self._derived[name]
+
+
+class DatasetHolder:
+    """Holds the current Dataset. A refresh loads the next version aside, then swaps it in.
+
+    Readers never wait on a refresh once a version exists: only the rerun that
+    finds the data expired reloads it, and sessions keep the version they started with.
+    """
+
+    def __init__(self, loader, max_age=DATA_MAX_AGE, shared_dir=SHARED_DIR):
+        self.loader = loader
+        self.max_age = max_age
+        self.shared_dir = shared_dir
+        self._dataset = None
+        self._stale = False
+        self._lock = threading.Lock()
+        if shared_dir:
+            os.makedirs(shared_dir, exist_ok=True)
+
+    def _expired(self, dataset):
+        return self._stale or (self.max_age > 0 and time.time() - dataset.loaded_at >= self.max_age)
+
+    def current(self):
+        """The latest Dataset, loading or refreshing it first when needed; None if nothing could be loaded"""
+        dataset = self._dataset
+        if dataset is not None and not self._expired(dataset):
+            return dataset
+        # With a version to serve, a rerun that finds a refresh already running keeps the old one
+        if not self._lock.acquire(blocking=dataset is None):
+            return dataset
+        try:
+            if self._dataset is not None and not self._expired(self._dataset):
+                return self._dataset
+            loaded = self._load()
+            if loaded is not None:
+                self._dataset, self._stale = loaded, False
+            # A failed refresh keeps serving the previous version
+            return self._dataset
+        finally:
+            self._lock.release()
+
+    def invalidate(self):
+        """Reload on the next current() call"""
+        self._stale = True
+        if self.shared_dir:
+            try:
+                os.remove(os.path.join(self.shared_dir, POINTER_NAME))
+            except FileNotFoundError:
+                pass
+
+    def _load(self):
+        with span('dataset.load', shared=bool(self.shared_dir)) as load_span:
+            if self.shared_dir and not self._stale:
+                dataset = self._attach()
+                if dataset is not None:
+                    load_span.set(version=dataset.version, attached=True)
+                    return dataset
+            loaded = self.loader()
+            if loaded is None:
+                return None
+            # Loaders return the events frame, or a Dataset of prebuilt structures
+            dataset = loaded if isinstance(loaded, Dataset) else Dataset(loaded)
+            dataset.version = f"{time.time_ns():x}"
+            if self.shared_dir and dataset.df is not None:
+                self._publish(dataset)
+            if load_span:
+                load_span.set(version=dataset.version, rows=None if dataset.df is None else len(dataset.df))
+            return dataset
+
+    # Sharing between server processes
+
+    def _attach(self):
+        """The version another process published, if it is still fresh"""
+        try:
+            with open(os.path.join(self.shared_dir, POINTER_NAME)) as f:
+                pointer = json.load(f)
+            if self.max_age > 0 and time.time() - pointer['loaded_at'] >= self.max_age:
+                return None
+            # The file stays mapped even after a newer version replaces it on disk
+            table = pa.ipc.open_file(pa.memory_map(os.path.join(self.shared_dir, pointer['file']))).read_all()
+        except (OSError, ValueError, KeyError):
+            return None
+        # Text columns become categoricals and dates are converted, so most of the frame is a
+        # private copy: attaching saves the warehouse query, not memory
+        return Dataset(table.to_pandas(split_blocks=True), pointer['version'], pointer['loaded_at'])
+
+    def _publish(self, dataset):
+        """Write the dataset as an Arrow file and point other processes at it"""
+        name = f"dataset-{dataset.version}.arrow"
+        path = os.path.join(self.shared_dir, name)
+        table = pa.Table.from_pandas(dataset.df, preserve_index=False)
+        with pa.OSFile(path + '.tmp', 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(path + '.tmp', path)
+        pointer_path = os.path.join(self.shared_dir, POINTER_NAME)
+        with open(pointer_path + '.tmp', 'w') as f:
+            json.dump({'version': dataset.version, 'file': name, 'loaded_at': dataset.loaded_at}, f)
+        os.replace(pointer_path + '.tmp', pointer_path)
+        # Processes still mapping an older version keep their mapping after the unlink
+        for old in glob.glob(os.path.join(self.shared_dir, 'dataset-*.arrow')):
+            if os.path.basename(old) != name:
+                os.remove(old)
@@ -3,62 +3,497 @@ Snowflake integration utilities for Cultural Tourism Dashboard
 """
 
 import pandas as pd
-import snowflake.connector
-from snowflake.connector.pandas_tools import write_pandas
+import pyarrow as pa
+import itertools
 import os
+import sqlite3
+import threading
+import time
 from dotenv import load_dotenv
 import streamlit as st
+from filter_compiler import compile_filters, check_column
+from tracing import span
 
 load_dotenv()
 
+SAMPLE_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'tourism_data_sample.csv')
+
+# Snowflake error codes raised when the session or its auth token has expired
+SESSION_EXPIRED_ERRNOS = {390112, 390114}
+
+# Rows per batch for backends that have no native Arrow result format
+LOCAL_BATCH_ROWS = 100_000
+
+
+def empty_arrow_table(columns):
+    """Zero-row table so callers still see the result's column names"""
+    return pa.table({column: pa.array([], type=pa.null()) for column in columns})
+
+
+class SnowflakeBackend:
+    """Opens connections to the Snowflake warehouse configured in .env"""
+    name = 'snowflake'
+    supports_pushdown = True
+
+    def connect(self):
+        # Imported on first connect: the connector takes most of a second to load and the
+        # local and offline backends never need it
+        import snowflake.connector
+
+        connection = snowflake.connector.connect(
+            account=os.getenv('SNOWFLAKE_ACCOUNT'),
+            user=os.getenv('SNOWFLAKE_USER'),
+            password=os.getenv('SNOWFLAKE_PASSWORD'),
+            warehouse=os.getenv('SNOWFLAKE_WAREHOUSE'),
+            database=os.getenv('SNOWFLAKE_DATABASE'),
+            schema=os.getenv('SNOWFLAKE_SCHEMA'),
+            role=os.getenv('SNOWFLAKE_ROLE'),
+            # Server-side binding keeps statement text stable for the result cache
+            paramstyle='qmark'
+        )
+        return connection
+
+    def is_alive(self, connection):
+        """Cheap round trip to make sure the session is still usable"""
+        if connection.is_closed():
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    def is_session_expired(self, error):
+        """True if the error means the session token has expired and a new login is needed"""
+        errno = getattr(error, 'errno', None)
+        return errno in SESSION_EXPIRED_ERRNOS or 'session has expired' in str(error).lower()
+
+    def fetch_arrow_batches(self, connection, query, params=None, info=None):
+        """Yield result batches as pyarrow Tables straight from Snowflake's Arrow result chunks.
+
+        The query ID is stored in `info` (when given) once the query has run.
+        """
+        cursor = connection.cursor()
+        try:
+            cursor.execute(query, params or None)
+            if info is not None:
+                info['query_id'] = cursor.sfqid
+            fetched = False
+            for batch in cursor.fetch_arrow_batches():
+                fetched = True
+                yield batch
+            if not fetched:
+                yield empty_arrow_table([column[0] for column in cursor.description])
+        finally:
+            cursor.close()
+
+    def close(self, connection):
+        connection.close()
+
+
+class LocalBackend:
+    """In-memory sqlite stand-in for CULTURAL_TOURISM_EVENTS, loaded from a CSV file"""
+    name = 'local'
+    # Aggregates are computed in pandas rather than pushed down to sqlite
+    supports_pushdown = False
+
+    def __init__(self, csv_path=SAMPLE_DATA_PATH):
+        self.csv_path = csv_path
+        self._data = None
+
+    def _load_data(self):
+        if self._data is None:
+            data = pd.read_csv(self.csv_path)
+            data.columns = [column.upper() for column in data.columns]
+            # The warehouse table derives these from DATE, so the stand-in does too
+            self._data = data.drop(columns=['MONTH', 'YEAR', 'QUARTER'], errors='ignore')
+        return self._data
+
+    def connect(self):
+        connection = sqlite3.connect(':memory:', check_same_thread=False)
+        # Snowflake date functions used by the dashboard queries
+        connection.create_function('MONTH', 1, lambda value: int(value[5:7]) if value else None, deterministic=True)
+        connection.create_function('YEAR', 1, lambda value: int(value[:4]) if value else None, deterministic=True)
+        connection.create_function('QUARTER', 1, lambda value: (int(value[5:7]) - 1) // 3 + 1 if value else None, deterministic=True)
+        self._load_data().to_sql('CULTURAL_TOURISM_EVENTS', connection, index=False)
+        return connection
+
+    def is_alive(self, connection):
+        try:
+            connection.execute("SELECT 1").fetchone()
+            return True
+        except Exception:
+            return False
+
+    def is_session_expired(self, error):
+        return False
+
+    def fetch_arrow_batches(self, connection, query, params=None, info=None, batch_rows=LOCAL_BATCH_ROWS):
+        """Yield result batches as pyarrow Tables; sqlite has no Arrow format, so rows are converted per batch"""
+        cursor = connection.execute(query, params or ())
+        try:
+            columns = [column[0] for column in cursor.description]
+            fetched = False
+            while True:
+                rows = cursor.fetchmany(batch_rows)
+                if not rows:
+                    break
+                fetched = True
+                yield pa.Table.from_pandas(pd.DataFrame.from_records(rows, columns=columns), preserve_index=False)
+            if not fetched:
+                yield empty_arrow_table(columns)
+        finally:
+            cursor.close()
+
+    def close(self, connection):
+        connection.close()
+
+
+BACKENDS = {
+    'snowflake': SnowflakeBackend,
+    'local': LocalBackend,
+}
+
+
+def get_backend(name=None):
+    """Create the backend named by `name` or the TOURISM_BACKEND env var"""
+    name = name or os.getenv('TOURISM_BACKEND', 'snowflake')
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+def open_connection(backend_name=None):
+    """SnowflakeConnection for the configured backend; 'offline' serves memory-mapped Arrow files"""
+    backend_name = backend_name or os.getenv('TOURISM_BACKEND', 'snowflake')
+    if backend_name == 'offline':
+        from offline_backend import OfflineConnection
+        return OfflineConnection()
+    return SnowflakeConnection(backend_name)
+
+
+class ConnectionPool:
+    """Bounded pool of backend connections shared by all Streamlit sessions"""
+
+    def __init__(self, backend, max_size=4, idle_timeout=600, health_check_interval=60, acquire_timeout=30):
+        self.backend = backend
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+        self._idle = []  # (connection, last_used, last_checked), most recently used last
+        self._open = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """Return a healthy connection, reusing an idle one when possible"""
+        deadline = time.monotonic() + self.acquire_timeout
+        with self._condition:
+            while True:
+                self._evict_idle()
+                if self._idle:
+                    connection, _, last_checked = self._idle.pop()
+                    break
+                if self._open < self.max_size:
+                    self._open += 1
+                    connection, last_checked = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No {self.backend.name} connection available after {self.acquire_timeout}s")
+                self._condition.wait(remaining)
+
+        if connection is not None:
+            if time.monotonic() - last_checked < self.health_check_interval or self.backend.is_alive(connection):
+                return connection
+            self._close(connection)
+            with self._condition:
+                self._open += 1
+
+        try:
+            with span('backend.connect', backend=self.backend.name):
+                return self.backend.connect()
+        except Exception:
+            with self._condition:
+                self._open -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, connection, discard=False):
+        """Hand a connection back to the pool, or close it if it is broken"""
+        if discard:
+            self._close(connection)
+            return
+        now = time.monotonic()
+        with self._condition:
+            self._idle.append((connection, now, now))
+            self._condition.notify()
+
+    def reconnect(self, connection):
+        """Replace a connection whose session has expired with a fresh one"""
+        self.release(connection, discard=True)
+        return self.acquire()
+
+    def close_all(self):
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for connection, _, _ in idle:
+            self._close(connection)
+
+    def _evict_idle(self):
+        # Caller holds the lock
+        cutoff = time.monotonic() - self.idle_timeout
+        expired = [entry for entry in self._idle if entry[1] < cutoff]
+        if expired:
+            self._idle = [entry for entry in self._idle if entry[1] >= cutoff]
+            for connection, _, _ in expired:
+                try:
+                    self.backend.close(connection)
+                except Exception:
+                    pass
+            self._open -= len(expired)
+
+    def _close(self, connection):
+        try:
+            self.backend.close(connection)
+        except Exception:
+            pass
+        with self._condition:
+            self._open -= 1
+            self._condition.notify()
+
+
+# Dimensions derived from DATE; everything else is a plain column
+DATE_DIMENSIONS = {
+    'YEAR': ('YEAR(DATE)', lambda dates: dates.dt.year),
+    'MONTH': ('MONTH(DATE)', lambda dates: dates.dt.month),
+    'QUARTER': ('QUARTER(DATE)', lambda dates: dates.dt.quarter),
+    'DAY': ('DAY(DATE)', lambda dates: dates.dt.day),
+    'WEEKDAY': ('DAYOFWEEKISO(DATE)', lambda dates: dates.dt.dayofweek + 1),  # 1 = Monday
+}
+
+MEASURE_FUNCTIONS = {
+    'sum': 'SUM({column})',
+    'mean': 'CAST(AVG({column}) AS FLOAT)',
+    'count': 'COUNT({column})',
+}
+
+
+class Measure:
+    """An aggregated column; `func` is sum, mean, count or count_where (rows where column == value)"""
+
+    def __init__(self, func, column, value=None):
+        if func != 'count_where' and func not in MEASURE_FUNCTIONS:
+            raise ValueError(f"Unknown measure function '{func}'")
+        self.func = func
+        self.column = column
+        self.value = value
+
+    def to_sql(self):
+        if self.func == 'count_where':
+            return f"SUM(CASE WHEN {self.column} = '{self.value}' THEN 1 ELSE 0 END)"
+        return MEASURE_FUNCTIONS[self.func].format(column=self.column)
+
+
+class Aggregate:
+    """A dashboard aggregate declared once and run either as GROUP BY SQL or in pandas"""
+
+    def __init__(self, name, dimensions, measures, order_by=None, ascending=False, limit=None):
+        self.name = name
+        self.dimensions = list(dimensions)
+        self.measures = measures  # output column -> Measure
+        self.order_by = order_by
+        self.ascending = ascending
+        self.limit = limit
+
+    def to_sql(self, filters=None):
+        """Compile to a GROUP BY query with the sidebar filters pushed down, returning (query, params)"""
+        select = [f"{DATE_DIMENSIONS[d][0]} AS {d}" if d in DATE_DIMENSIONS else d for d in self.dimensions]
+        select += [f"{measure.to_sql()} AS {name}" for name, measure in self.measures.items()]
+        query = "SELECT " + ", ".join(select) + " FROM CULTURAL_TOURISM_EVENTS"
+        where_clause, params = compile_filters(filters)
+        query += where_clause
+        query += " GROUP BY " + ", ".join(self.dimensions)
+        if self.order_by:
+            query += f" ORDER BY {self.order_by} {'ASC' if self.ascending else 'DESC'}"
+        else:
+            query += " ORDER BY " + ", ".join(self.dimensions)
+        if self.limit:
+            query += f" LIMIT {self.limit}"
+        return query, params
+
+    def evaluate(self, df):
+        """Compute the same result from an already filtered DataFrame"""
+        date_column = 'Date' if 'Date' in df.columns else 'DATE'
+        dates = None
+        keys = {}
+        for dimension in self.dimensions:
+            if dimension in df.columns:
+                keys[dimension] = df[dimension]
+            else:
+                if dates is None:
+                    dates = pd.to_datetime(df[date_column])
+                keys[dimension] = DATE_DIMENSIONS[dimension][1](dates)
+
+        values = {}
+        named_aggs = {}
+        for name, measure in self.measures.items():
+            if measure.func == 'count_where':
+                values[name] = (df[measure.column] == measure.value).astype('int64')
+                named_aggs[name] = (name, 'sum')
+            else:
+                values[name] = df[measure.column]
+                named_aggs[name] = (name, measure.func)
+        frame = pd.DataFrame({**keys, **values})
+
+        result = frame.groupby(self.dimensions, observed=True).agg(**named_aggs).reset_index()
+        return self.order_and_limit(result)
+
+    def order_and_limit(self, result):
+        """Apply the declared ORDER BY / LIMIT to a grouped pandas result"""
+        if self.order_by:
+            result = result.sort_values(self.order_by, ascending=self.ascending, kind='stable')
+        if self.limit:
+            result = result.head(self.limit)
+        return result.reset_index(drop=True)
+
+
+# Every aggregate the dashboard tabs draw, keyed by name
+DASHBOARD_AGGREGATES = {aggregate.name: aggregate for aggregate in [
+    Aggregate('monthly_trend', ['YEAR', 'MONTH'], {'VISITORS': Measure('sum', 'VISITORS')}),
+    Aggregate('top_events', ['EVENT'], {'VISITORS': Measure('sum', 'VISITORS')}, order_by='VISITORS', limit=10),
+    Aggregate('state_stats', ['STATE'], {
+        'VISITORS': Measure('sum', 'VISITORS'),
+        'REVENUE_INR': Measure('sum', 'REVENUE_INR'),
+        'LOCAL_EMPLOYMENT': Measure('sum', 'LOCAL_EMPLOYMENT'),
+        'EVENTS': Measure('count', 'EVENT'),
+    }, order_by='VISITORS'),
+    Aggregate('seasonal_means', ['MONTH'], {'VISITORS': Measure('mean', 'VISITORS')}),
+    Aggregate('weekday_means', ['WEEKDAY'], {'VISITORS': Measure('mean', 'VISITORS')}),
+    Aggregate('calendar_heatmap', ['MONTH', 'DAY'], {'VISITORS': Measure('sum', 'VISITORS')}),
+    Aggregate('regional_visitors', ['REGION'], {'VISITORS': Measure('sum', 'VISITORS')}),
+    Aggregate('art_forms', ['ART_FORM'], {'VISITORS': Measure('sum', 'VISITORS')}, order_by='VISITORS', limit=8),
+    Aggregate('regional_insights', ['REGION'], {
+        'TOTAL_VISITORS': Measure('sum', 'VISITORS'),
+        'AVG_VISITORS': Measure('mean', 'VISITORS'),
+        'REVENUE_INR': Measure('sum', 'REVENUE_INR'),
+        'LOCAL_EMPLOYMENT': Measure('sum', 'LOCAL_EMPLOYMENT'),
+        'HIGH_TOURISM_EVENTS': Measure('count_where', 'TOURISM_LEVEL', 'High'),
+    }),
+    Aggregate('economic_impact', ['STATE'], {
+        'REVENUE_INR': Measure('sum', 'REVENUE_INR'),
+        'LOCAL_EMPLOYMENT': Measure('sum', 'LOCAL_EMPLOYMENT'),
+        'VISITORS': Measure('sum', 'VISITORS'),
+    }),
+]}
+
+
+@st.cache_resource
+def get_connection_pool(backend_name=None):
+    """Process-wide connection pool, shared across Streamlit sessions"""
+    backend = get_backend(backend_name)
+    return ConnectionPool(
+        backend,
+        max_size=int(os.getenv('TOURISM_POOL_SIZE', 4)),
+        idle_timeout=int(os.getenv('TOURISM_POOL_IDLE_TIMEOUT', 600)),
+    )
+
+
 class SnowflakeConnection:
-    def __init__(self):
+    def __init__(self, backend=None, pool=None):
+        self.pool = pool or get_connection_pool(backend)
         self.connection = None
-        self.cursor = None
-        
+
+    @property
+    def backend(self):
+        return self.pool.backend
+
     def connect(self):
-        """Establish connection to Snowflake"""
+        """Check out a connection from the shared pool"""
+        if self.connection is not None:
+            return True
         try:
-            print(f"before connection")
-            self.connection = snowflake.connector.connect(
-                account=os.getenv('SNOWFLAKE_ACCOUNT'),
-                user=os.getenv('SNOWFLAKE_USER'),
-                password=os.getenv('SNOWFLAKE_PASSWORD'),
-                warehouse=os.getenv('SNOWFLAKE_WAREHOUSE'),
-                database=os.getenv('SNOWFLAKE_DATABASE'),
-                schema=os.getenv('SNOWFLAKE_SCHEMA'),
-                role=os.getenv('SNOWFLAKE_ROLE')
-            )
-            self.cursor = self.connection.cursor()
-            print(f"after connection")
+            with span('pool.acquire', backend=self.backend.name):
+                self.connection = self.pool.acquire()
             return True
         except Exception as e:
             st.error(f"Failed to connect to Snowflake: {str(e)}")
             return False
-    
+
     def disconnect(self):
-        """Close Snowflake connection"""
-        if self.cursor:
-            self.cursor.close()
-        if self.connection:
-            self.connection.close()
-    
-    def execute_query(self, query):
-        """Execute SQL query and return results as DataFrame"""
+        """Return the connection to the shared pool"""
+        if self.connection is not None:
+            self.pool.release(self.connection)
+            self.connection = None
+
+    def fetch_arrow_batches(self, query, params=None):
+        """Stream query results as pyarrow Tables, one per result batch.
+
+        The connection is held until the generator is exhausted or closed.
+        Errors are raised to the caller rather than reported in the page.
+        """
+        held = self.connection is not None
+        if not held and not self.connect():
+            return
+        batches = None
         try:
-            if not self.connection:
-                if not self.connect():
-                    return None
-            
-            df = pd.read_sql(query, self.connection)
-            return df
+            # Spans the query from execution until its last batch has been consumed
+            with span('query', backend=self.backend.name) as query_span:
+                retried = False
+                while True:
+                    info = {}
+                    batches = self.backend.fetch_arrow_batches(self.connection, query, params, info)
+                    try:
+                        first = next(batches)
+                    except Exception as e:
+                        if retried or not self.backend.is_session_expired(e):
+                            raise
+                        # Only retry before anything was yielded, so no batch is seen twice
+                        retried = True
+                        expired, self.connection = self.connection, None
+                        self.connection = self.pool.reconnect(expired)
+                        continue
+                    query_span.set(query_id=info.get('query_id'), retried=retried)
+                    for batch in itertools.chain([first], batches):
+                        if query_span:
+                            query_span.add(rows=batch.num_rows, bytes=batch.nbytes)
+                        yield batch
+                    return
+        finally:
+            if batches is not None:
+                batches.close()
+            if not held:
+                self.disconnect()
+
+    def fetch_pandas_batches(self, query, params=None):
+        """Stream query results as DataFrames, one per result batch"""
+        for batch in self.fetch_arrow_batches(query, params):
+            yield batch.to_pandas(self_destruct=True, split_blocks=True)
+
+    def fetch_arrow(self, query, params=None):
+        """Fetch the whole result as a single pyarrow Table, or None if no connection was available"""
+        batches = list(self.fetch_arrow_batches(query, params))
+        if not batches:
+            return None
+        # Concatenation only stitches batch buffers together, nothing is copied
+        return pa.concat_tables(batches, promote_options='permissive')
+
+    def execute_query(self, query, params=None):
+        """Execute SQL query with ? bind parameters and return results as DataFrame"""
+        try:
+            table = self.fetch_arrow(query, params)
+            if table is None:
+                return None
+            # self_destruct frees each Arrow column as it is converted, so memory
+            # does not peak at twice the frame size
+            return table.to_pandas(self_destruct=True, split_blocks=True)
         except Exception as e:
             st.error(f"Query execution failed: {str(e)}")
             return None
-    
-    def load_cultural_data(self, filters=None):
-        print("inside function")
-        """Load cultural tourism data from Snowflake"""
+
+    def cultural_data_query(self, filters=None, ordered=True):
+        """Build the (query, params) pair load_cultural_data() runs"""
         base_query = """
         SELECT 
             DATE,
@@ -76,44 +511,66 @@ class SnowflakeConnection:
         FROM CULTURAL_TOURISM_EVENTS
         """
         
-        # Add filters if provided
-        where_conditions = []
-        if filters:
-            if filters.get('state') and filters['state'] != 'All':
-                where_conditions.append(f"STATE = '{filters['state']}'")
-            if filters.get('year') and filters['year'] != 'All':
-                where_conditions.append(f"YEAR = {filters['year']}")
-            if filters.get('event') and filters['event'] != 'All':
-                where_conditions.append(f"EVENT = '{filters['event']}'")
-            if filters.get('art_form') and filters['art_form'] != 'All':
-                where_conditions.append(f"ART_FORM = '{filters['art_form']}'")
-            if filters.get('tourism_level') and filters['tourism_level'] != 'All':
-                where_conditions.append(f"TOURISM_LEVEL = '{filters['tourism_level']}'")
-            if filters.get('region') and filters['region'] != 'All':
-                where_conditions.append(f"REGION = '{filters['region']}'")
-            if filters.get('quarter') and filters['quarter'] != 'All':
-                where_conditions.append(f"QUARTER = {filters['quarter']}")
-            if filters.get('month') and filters['month'] != 'All':
-                where_conditions.append(f"MONTH = {filters['month']}")
-        
         # Add WHERE clause if filters exist
-        if where_conditions:
-            base_query += " WHERE " + " AND ".join(where_conditions)
+        where_clause, params = compile_filters(filters)
+        base_query += where_clause
         
         # Add ORDER BY clause
-        base_query += " ORDER BY DATE DESC"
-        vr = self.execute_query(base_query)
-        print(vr)
+        if ordered:
+            base_query += " ORDER BY DATE DESC"
+        return base_query, params
+    
+    def load_cultural_data(self, filters=None):
+        """Load cultural tourism data from Snowflake"""
+        with span('load_cultural_data') as load_span:
+            vr = self.execute_query(*self.cultural_data_query(filters))
+            if load_span and vr is not None:
+                load_span.set(rows=len(vr))
         return vr
     
-    def get_unique_values(self, column_name):
+    def iter_cultural_data(self, filters=None):
+        """Stream the cultural tourism data as DataFrames, one result batch at a time and in no particular order.
+
+        Errors are raised to the caller rather than reported in the page.
+        """
+        yield from self.fetch_pandas_batches(*self.cultural_data_query(filters, ordered=False))
+    
+    def run_aggregate(self, name, filters=None):
+        """Compute one of DASHBOARD_AGGREGATES, pushed down to the warehouse when the backend supports it"""
+        aggregate = DASHBOARD_AGGREGATES[name]
+        if self.backend.supports_pushdown:
+            return self.execute_query(*aggregate.to_sql(filters))
+        df = self.load_cultural_data(filters)
+        if df is None:
+            return None
+        # Imported here: compute_engine takes DATE_DIMENSIONS from this module
+        from compute_engine import get_compute_engine
+
+        return get_compute_engine().aggregate(aggregate, df)
+
+    def get_unique_values(self, column_name, filters=None):
         """Get unique values for a specific column from the cultural tourism data"""
+        column_name = check_column(column_name)
+        where_clause, params = compile_filters(filters)
         query = f"""
         SELECT DISTINCT {column_name}
-        FROM CULTURAL_TOURISM_EVENTS
+        FROM CULTURAL_TOURISM_EVENTS{where_clause}
         ORDER BY {column_name}
         """
-        return self.execute_query(query)
+        return self.execute_query(query, params)
+    
+    def get_filter_combinations(self):
+        """Every (STATE, EVENT, YEAR) that occurs, with its row count, in one grouped query.
+
+        Errors are raised rather than shown: the dashboard falls back to the loaded data.
+        """
+        query = """
+        SELECT STATE, EVENT, YEAR(DATE) AS YEAR, COUNT(*) AS ROW_COUNT
+        FROM CULTURAL_TOURISM_EVENTS
+        GROUP BY STATE, EVENT, YEAR(DATE)
+        """
+        table = self.fetch_arrow(query)
+        return None if table is None else table.to_pandas()
     
     def get_summary_statistics(self, filters=None):
         """Get summary statistics for the cultural tourism data"""
@@ -128,28 +585,8 @@ class SnowflakeConnection:
         FROM CULTURAL_TOURISM_EVENTS
         """
         
-        # Add filters if provided
-        where_conditions = []
-        if filters:
-            if filters.get('state') and filters['state'] != 'All':
-                where_conditions.append(f"STATE = '{filters['state']}'")
-            if filters.get('year') and filters['year'] != 'All':
-                where_conditions.append(f"YEAR = {filters['year']}")
-            if filters.get('event') and filters['event'] != 'All':
-                where_conditions.append(f"EVENT = '{filters['event']}'")
-            if filters.get('art_form') and filters['art_form'] != 'All':
-                where_conditions.append(f"ART_FORM = '{filters['art_form']}'")
-            if filters.get('tourism_level') and filters['tourism_level'] != 'All':
-                where_conditions.append(f"TOURISM_LEVEL = '{filters['tourism_level']}'")
-            if filters.get('region') and filters['region'] != 'All':
-                where_conditions.append(f"REGION = '{filters['region']}'")
-            if filters.get('quarter') and filters['quarter'] != 'All':
-                where_conditions.append(f"QUARTER = {filters['quarter']}")
-            if filters.get('month') and filters['month'] != 'All':
-                where_conditions.append(f"MONTH = {filters['month']}")
-        
         # Add WHERE clause if filters exist
-        if where_conditions:
-            base_query += " WHERE " + " AND ".join(where_conditions)
+        where_clause, params = compile_filters(filters)
+        base_query += where_clause
         
-        return self.execute_query(base_query)
\ No newline at end of file
+        return self.execute_query(base_query, params)
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Every compute engine must give the pandas path's results
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic_data import event_catalog, generate_chunk
+from compute_engine import DuckDBEngine, PandasEngine
+from cube import CUBE_DIMENSIONS, CUBE_MEASURES, Cube
+from frame_builder import build_frame
+from kpis import compute_kpis
+from snowflake_utils import DASHBOARD_AGGREGATES
+
+# min_rows=0 so DuckDB runs even on these small frames instead of falling back to pandas
+ENGINES = {'duckdb': lambda: DuckDBEngine(min_rows=0)}
+
+
+def assert_same(expected, actual):
+    """Same rows and values; dtypes may differ (e.g. int32 vs int64 date parts)"""
+    pd.testing.assert_frame_equal(expected.reset_index(drop=True), actual.reset_index(drop=True),
+                                  check_dtype=False, check_categorical=False, rtol=1e-9)
+
+
+@pytest.fixture(scope='module')
+def events():
+    rng = np.random.default_rng(0)
+    raw = generate_chunk(5000, event_catalog(20, rng), rng).to_pandas()
+    raw.columns = [column.upper() for column in raw.columns]
+    # As the warehouse query returns them: date parts are derived by build_frame()
+    return build_frame(raw.drop(columns=['MONTH', 'YEAR', 'QUARTER']))
+
+
+@pytest.fixture(params=sorted(ENGINES))
+def engine(request):
+    return ENGINES[request.param]()
+
+
+def test_group_sum_with_null_and_categorical_keys(engine):
+    frame = pd.DataFrame({
+        'STATE': pd.Categorical(['Goa', 'Kerala', None, 'Goa', None, 'Assam'],
+                                categories=['Kerala', 'Goa', 'Assam']),
+        'YEAR': [2020, 2021, 2020, np.nan, 2020, 2021],
+        'VISITORS': [1, 2, 3, 4, 5, 6],
+        'EVENTS': [1, 1, 1, 1, 1, 1],
+    })
+    expected = PandasEngine().group_sum(frame, ['STATE', 'YEAR'], ['VISITORS', 'EVENTS'])
+    result = engine.group_sum(frame, ['STATE', 'YEAR'], ['VISITORS', 'EVENTS'])
+    assert_same(expected, result)
+    assert isinstance(result['STATE'].dtype, pd.CategoricalDtype)
+
+
+def test_cube_matches_pandas(engine, events):
+    expected, cube = Cube(events, engine=PandasEngine()), Cube(events, engine=engine)
+    assert_same(expected.cells, cube.cells)
+    assert list(cube.cells.columns) == CUBE_DIMENSIONS + CUBE_MEASURES
+    for aggregate in DASHBOARD_AGGREGATES.values():
+        assert_same(expected.evaluate(aggregate, expected.cells), cube.evaluate(aggregate, cube.cells))
+
+
+@pytest.mark.parametrize('name', sorted(DASHBOARD_AGGREGATES))
+def test_aggregate_matches_pandas(engine, events, name):
+    aggregate = DASHBOARD_AGGREGATES[name]
+    assert_same(PandasEngine().aggregate(aggregate, events), engine.aggregate(aggregate, events))
+
+
+def test_compute_kpis_matches_pandas(engine, events):
+    cells = Cube(events, engine=PandasEngine()).cells
+    state = cells['STATE'].iloc[0]
+    for selection in (cells, cells[cells['STATE'] == state]):
+        expected, kpis = compute_kpis(selection, PandasEngine()), compute_kpis(selection, engine)
+        for attribute in ('visitors', 'events', 'revenue', 'employment', 'peak_month', 'peak_state', 'peak_event',
+                          'level_counts'):
+            assert getattr(kpis, attribute) == getattr(expected, attribute)
+        assert_same(expected.economic, kpis.economic)
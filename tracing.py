@@ -0,0 +1,200 @@
+"""
+Lightweight tracing for Cultural Tourism Dashboard: timed spans, a per-run view and JSONL/Prometheus export
+"""
+
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class Span:
+    """One timed operation; use as a context manager and attach attributes with set()/add()"""
+
+    __slots__ = ('tracer', 'id', 'parent', 'name', 'attributes', 'start', 'duration', 'thread', '_started')
+
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.id = next(tracer._ids)
+        self.parent = None
+        self.name = name
+        self.attributes = attributes
+        self.start = None
+        self.duration = None
+        self.thread = threading.current_thread().name
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add(self, **counts):
+        """Accumulate numeric attributes, e.g. rows and bytes over result batches"""
+        for key, value in counts.items():
+            self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        self.parent = stack[-1].id if stack else None
+        stack.append(self)
+        self.start = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.duration = time.perf_counter() - self._started
+        if exc_type is not None:
+            self.attributes['error'] = exc_type.__name__
+        stack = self.tracer._stack()
+        # Generators can close their spans out of order, so remove rather than pop
+        if self in stack:
+            stack.remove(self)
+        self.tracer._finish(self)
+        return False
+
+    def to_dict(self):
+        return {'id': self.id, 'parent': self.parent, 'name': self.name, 'start': self.start,
+                'seconds': self.duration, 'thread': self.thread, **self.attributes}
+
+
+class _NoopSpan:
+    """Shared stand-in returned while tracing is off; falsy so callers can skip computing attributes"""
+
+    def set(self, **attributes):
+        pass
+
+    def add(self, **counts):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+    def __bool__(self):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Collects finished spans: recent ones in memory, totals per span name, and the spans of each script run"""
+
+    def __init__(self, enabled=False, jsonl_path=None, prometheus_path=None, max_spans=10_000):
+        self.enabled = enabled
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self.recent = deque(maxlen=max_spans)
+        self.totals = {}  # span name -> {'count', 'seconds', 'max_seconds', numeric attribute sums}
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def span(self, name, **attributes):
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, attributes)
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _finish(self, span):
+        record = span.to_dict()
+        with self._lock:
+            self.recent.append(record)
+            totals = self.totals.setdefault(span.name, {'count': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            totals['count'] += 1
+            totals['seconds'] += span.duration
+            totals['max_seconds'] = max(totals['max_seconds'], span.duration)
+            for key in ('rows', 'bytes'):
+                if isinstance(span.attributes.get(key), (int, float)):
+                    totals[key] = totals.get(key, 0) + span.attributes[key]
+            if self.jsonl_path:
+                with open(self.jsonl_path, 'a') as f:
+                    f.write(json.dumps(record, default=str) + '\n')
+        run = getattr(self._local, 'run', None)
+        if run is not None:
+            run.append(record)
+
+    def begin_run(self):
+        """Start collecting the spans this thread finishes, i.e. one Streamlit script run"""
+        if self.enabled:
+            self._local.run = []
+
+    def end_run(self):
+        """Spans finished since begin_run(); also refreshes the Prometheus textfile"""
+        run = getattr(self._local, 'run', None) or []
+        self._local.run = None
+        if self.enabled and self.prometheus_path:
+            self.write_prometheus(self.prometheus_path)
+        return run
+
+    def prometheus_text(self):
+        """Per-span totals in the Prometheus text exposition format"""
+        with self._lock:
+            totals = {name: dict(values) for name, values in self.totals.items()}
+        metrics = [
+            ('tourism_span_seconds_total', 'counter', 'Seconds spent in traced spans', 'seconds'),
+            ('tourism_span_count_total', 'counter', 'Traced spans finished', 'count'),
+            ('tourism_span_seconds_max', 'gauge', 'Longest single traced span', 'max_seconds'),
+            ('tourism_span_rows_total', 'counter', 'Rows fetched or processed in traced spans', 'rows'),
+            ('tourism_span_bytes_total', 'counter', 'Bytes fetched in traced spans', 'bytes'),
+        ]
+        lines = []
+        for metric, kind, description, key in metrics:
+            samples = [(name, values[key]) for name, values in sorted(totals.items()) if key in values]
+            if not samples:
+                continue
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} {kind}"]
+            lines += [f'{metric}{{span="{name}"}} {value}' for name, value in samples]
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Write prometheus_text() for node_exporter's textfile collector (atomically, as it requires)"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+
+_tracer = Tracer(
+    enabled=os.getenv('TOURISM_TRACE', '0') == '1',
+    jsonl_path=os.getenv('TOURISM_TRACE_FILE') or None,
+    prometheus_path=os.getenv('TOURISM_TRACE_PROM') or None,
+)
+
+
+def get_tracer():
+    """The process-wide tracer, enabled by TOURISM_TRACE=1"""
+    return _tracer
+
+
+def span(name, **attributes):
+    """Context manager timing `name`; a shared no-op when tracing is off"""
+    if not _tracer.enabled:
+        return NOOP_SPAN
+    return Span(_tracer, name, attributes)
+
+
+def traced(name):
+    """Decorator running the function inside span(name); returns the function untouched when tracing is off"""
+    def decorate(fn):
+        if not _tracer.enabled:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with Span(_tracer, name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate